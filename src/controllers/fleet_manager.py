@@ -1,36 +1,66 @@
 import time
-from src.models.nav_graph import NavGraph
+from src.models.site import Site
 from src.models.robot import Robot
+from src.utils.file_watcher import FileWatcher
 
 
 class FleetManager:
-    def __init__(self, graph_file, levelname):
-        self.graph = NavGraph(graph_file, levelname)
+    def __init__(self, graph_file, levelname, memory_budget=None):
+        self.site = Site(graph_file, memory_budget=memory_budget)
+        self.site.level(levelname)  # Fail early on an unknown level
+        self.level_name = levelname  # Level shown/dispatched now
         self.robots = {}
         self.robot_counter = 0
+        # Picks up edits of the graph file (see check_graph_file)
+        self.graph_watcher = FileWatcher(graph_file, self.reload_graph)
 
-    def spawn_robot(self, start_vertex):
-        if start_vertex not in self.graph.vertices:
+    @property
+    def graph(self):
+        """NavGraph of the current level; looked up on every use, as the site
+        may evict a level and load it again"""
+        return self.site.level(self.level_name)
+
+    def switch_level(self, level_name):
+        """Make another level of the site the current one (robots stay put)"""
+        self.site.level(level_name)
+        self.level_name = level_name
+
+    def graph_for(self, robot):
+        """NavGraph of the level a robot is on"""
+        return self.site.level(robot.level)
+
+    def spawn_robot(self, start_vertex, level_name=None):
+        level_name = level_name or self.level_name
+        if start_vertex not in self.site.level(level_name).vertices:
             print(f"❌ Invalid spawn location: {start_vertex}")
             return
 
         self.robot_counter += 1
         robot_id = f"R{self.robot_counter}"
-        new_robot = Robot(robot_id, start_vertex)
+        new_robot = Robot(robot_id, start_vertex, level_name)
         self.robots[robot_id] = new_robot
-        print(f"✅ Robot {robot_id} spawned at {start_vertex}")
+        print(f"✅ Robot {robot_id} spawned at {start_vertex} on {level_name}")
 
-    def assign_task(self, robot_id, destination):
+    def assign_task(self, robot_id, destination, level_name=None):
         if robot_id not in self.robots:
             print(f"❌ Robot {robot_id} not found")
             return
 
-        if destination not in self.graph.vertices:
+        robot = self.robots[robot_id]
+        if level_name and level_name != robot.level:
+            self.assign_cross_level_task(robot, level_name, destination)
+            return
+
+        graph = self.graph_for(robot)
+        snapshot = graph.snapshot  # Check both against one version
+        if destination not in snapshot.vertices:
             print(f"❌ Invalid destination: {destination}")
             return
+        if snapshot.unreachable(robot.current_position, destination):
+            print(f"⚠️ {destination} is unreachable from {robot.current_position}")
+            return
 
-        robot = self.robots[robot_id]
-        path = self.graph.get_shortest_path(robot.current_position, destination)
+        path = graph.get_shortest_path(robot.current_position, destination)
 
         if not path:
             print(f"⚠️ No valid path from {robot.current_position} to {destination}")
@@ -39,6 +69,124 @@ class FleetManager:
         robot.assign_task(destination, path)  # 🔄 Fixed incorrect method call
         print(f"🚀 Robot {robot_id} assigned task to {destination} via {path}")
 
+    def assign_cross_level_task(self, robot, level_name, destination):
+        legs, _ = self.site.plan_route(
+            robot.level, robot.current_position, level_name, destination
+        )
+        if not legs:
+            print(
+                f"⚠️ No valid route from {robot.current_position} on {robot.level} "
+                f"to {destination} on {level_name}"
+            )
+            return
+
+        robot.assign_task(destination, list(legs[0][1]), legs[1:])
+        print(
+            f"🚀 Robot {robot.robot_id} assigned task to {destination} "
+            f"on {level_name} via {legs}"
+        )
+
+    def close_lane(self, start, end, level_name=None):
+        """Close a lane and reroute the robots affected by it"""
+        level_name = level_name or self.level_name
+        self.site.level(level_name).close_lane(start, end)
+        self.replan_robots(level_name)
+
+    def reopen_lane(self, start, end, level_name=None):
+        """Reopen a lane; robots switch to it if it gives a cheaper route"""
+        level_name = level_name or self.level_name
+        self.site.level(level_name).reopen_lane(start, end)
+        self.replan_robots(level_name)
+
+    def set_speed_limit(self, start, end, speed_limit, level_name=None):
+        """Change a lane's speed limit and reroute robots accordingly"""
+        level_name = level_name or self.level_name
+        self.site.level(level_name).set_speed_limit(start, end, speed_limit)
+        self.replan_robots(level_name)
+
+    def replan_robots(self, level_name, lanes=None):
+        """Repair the routes of moving robots on a level after lane changes.
+
+        Each robot's current leg on the level is replanned to its end (the
+        destination, or the connector it leaves the level through), as are
+        the legs it still has queued on the level, with the graph's
+        incremental planners, so robots sharing a target share the repair
+        work. With lanes ((start, end) pairs), only legs that use one of
+        them are replanned.
+        """
+        graph = self.site.level(level_name)
+        targets = set()
+        for robot in self.robots.values():
+            if robot.level == level_name and robot.path:
+                remaining = robot.path
+                if remaining[0] == robot.current_position:
+                    remaining = remaining[1:]
+                route = [robot.current_position, *remaining]
+                path = self._replanned_leg(graph, robot, route, lanes, targets)
+                if path:
+                    robot.reroute(path[1:])
+                    print(f"🔀 Robot {robot.robot_id} rerouted via {path}")
+
+            for index, (leg_level, leg_path) in enumerate(robot.legs):
+                if leg_level != level_name:
+                    continue
+                route = list(leg_path)
+                path = self._replanned_leg(graph, robot, route, lanes, targets)
+                if path:
+                    robot.reroute_leg(index, path)
+                    print(
+                        f"🔀 Robot {robot.robot_id} rerouted on {level_name} "
+                        f"via {path}"
+                    )
+        graph.release_planners(keep=targets)
+
+    def _replanned_leg(self, graph, robot, route, lanes, targets):
+        """New path between the ends of route (a vertex list), or None if
+        route is unaffected by lanes, still optimal or cannot be repaired."""
+        targets.add(route[-1])
+        if lanes is not None and lanes.isdisjoint(zip(route, route[1:])):
+            return None
+        path, _ = graph.find_path_incremental(route[0], route[-1])
+        if not path:
+            print(
+                f"⚠️ No valid path from {route[0]} to {route[-1]} "
+                f"for {robot.robot_id}"
+            )
+            return None
+        return path if path != route else None
+
+    def reload_graph(self):
+        """Apply edits of the graph file without a restart; only robots
+        whose remaining route uses a changed lane are rerouted"""
+        # Levels shown or with robots on their routes must stay
+        in_use = {self.level_name}
+        for robot in self.robots.values():
+            in_use.add(robot.level)
+            in_use.update(level_name for level_name, _ in robot.legs)
+        try:
+            changes = self.site.reload(keep=in_use)
+        except (OSError, ValueError) as error:
+            # E.g. a file caught halfway through saving: the old graph stays
+            print(f"❌ Graph file not reloaded: {error}")
+            return {}
+
+        for level_name, lanes in changes.items():
+            if lanes is None:
+                print(f"⚠️ Level {level_name} was removed from the graph file")
+                continue
+            print(f"🔄 Reloaded {level_name}: {len(lanes)} lanes changed")
+            self.replan_robots(level_name, lanes)
+        return changes
+
+    def check_graph_file(self):
+        """Reload the graph file if it changed on disk; True if it did"""
+        return self.graph_watcher.poll()
+
+    def watch_graph_file(self, interval=1.0):
+        """Check the graph file every interval seconds on a background thread"""
+        self.graph_watcher.interval = interval
+        self.graph_watcher.start()
+
     def move_robots(self):
         while True:
             active_robots = [
@@ -49,10 +197,13 @@ class FleetManager:
 
             for robot in active_robots:
                 previous_position = robot.current_position
+                previous_level = robot.level
                 robot.move()
 
-                if robot.current_position != previous_position:
-                    speed = self.graph.get_speed_limit(
+                if robot.level != previous_level:
+                    print(f"🛗 {robot.robot_id} transferred to {robot.level}")
+                elif robot.current_position != previous_position:
+                    speed = self.graph_for(robot).get_speed_limit(
                         previous_position, robot.current_position
                     )
                     print(
@@ -108,6 +108,15 @@ class EnhancedFleetGUI:
             fg="white",
         ).pack(fill=tk.X, pady=2)
 
+        # Level selector (all levels of the site stay loaded)
+        self.level_var = tk.StringVar(value=self.fleet_manager.level_name)
+        tk.OptionMenu(
+            self.control_frame,
+            self.level_var,
+            *self.fleet_manager.site.level_names,
+            command=self.switch_level,
+        ).pack(fill=tk.X, pady=2)
+
         # Status Panel
         self.status_frame = tk.LabelFrame(self.control_frame, text="System Status")
         self.status_frame.pack(fill=tk.X, pady=5)
@@ -145,7 +154,8 @@ class EnhancedFleetGUI:
 
     def draw_graph(self):
         self.canvas.delete("all")
-        raw_vertices = self.fleet_manager.graph.get_vertices()
+        graph = self.fleet_manager.graph.snapshot  # One consistent version
+        raw_vertices = graph.vertices
         if not raw_vertices:
             return
 
@@ -153,10 +163,8 @@ class EnhancedFleetGUI:
         canvas_width = self.canvas.winfo_width()
         canvas_height = self.canvas.winfo_height()
 
-        all_x = [v["x"] for v in raw_vertices.values()]
-        all_y = [v["y"] for v in raw_vertices.values()]
-        min_x, max_x = min(all_x), max(all_x)
-        min_y, max_y = min(all_y), max(all_y)
+        min_x, max_x = min(graph.vertex_x), max(graph.vertex_x)
+        min_y, max_y = min(graph.vertex_y), max(graph.vertex_y)
 
         padding = 0.1
         x_range = max_x - min_x or 1
@@ -168,23 +176,22 @@ class EnhancedFleetGUI:
 
         offset_x = padding * canvas_width - min_x * scale
         offset_y = padding * canvas_height - min_y * scale
+        self.view_transform = (scale, offset_x, offset_y)
 
-        for lane in self.fleet_manager.graph.get_lanes():
-            start, end = lane["start"], lane["end"]
-            if start in raw_vertices and end in raw_vertices:
-                x1, y1 = (
-                    offset_x + raw_vertices[start]["x"] * scale,
-                    offset_y + raw_vertices[start]["y"] * scale,
-                )
-                x2, y2 = (
-                    offset_x + raw_vertices[end]["x"] * scale,
-                    offset_y + raw_vertices[end]["y"] * scale,
-                )
-                self.canvas.create_line(x1, y1, x2, y2, fill="#aaa", width=2)
+        self.vertices = {
+            idx: (offset_x + x * scale, offset_y + y * scale)
+            for idx, (x, y) in enumerate(zip(graph.vertex_x, graph.vertex_y))
+        }
+        for start, end in zip(graph.lane_start, graph.lane_end):
+            # Two-way aisles are listed in both directions; draw them once
+            if end < start and (end, start) in graph.lane_index:
+                continue
+            self.canvas.create_line(
+                *self.vertices[start], *self.vertices[end], fill="#aaa", width=2
+            )
 
         for idx, vertex in raw_vertices.items():
-            x, y = offset_x + vertex["x"] * scale, offset_y + vertex["y"] * scale
-            self.vertices[idx] = (x, y)
+            x, y = self.vertices[idx]
             color = "green" if vertex.get("is_charger") else "red"
 
             self.canvas.create_oval(
@@ -252,9 +259,14 @@ class EnhancedFleetGUI:
             self.log_event(f"Failed to spawn robot {robot_id}", "error")
             return
 
-        x, y = self.vertices[vertex_id]
-        color = self.robot_colors[len(self.robots) % len(self.robot_colors)]
+        color = self.robot_colors[len(self.robot_data) % len(self.robot_colors)]
+        self.create_robot_visuals(robot_id, vertex_id, color)
+
+        self.log_event(f"Robot {robot_id} spawned at vertex {vertex_id}")
+        self.update_status_panel()
 
+    def create_robot_visuals(self, robot_id, vertex_id, color):
+        x, y = self.vertices[vertex_id]
         robot_body = self.canvas.create_oval(
             x - 12,
             y - 12,
@@ -289,19 +301,35 @@ class EnhancedFleetGUI:
             "path_line": None,
         }
 
-        self.log_event(f"Robot {robot_id} spawned at vertex {vertex_id}")
-        self.update_status_panel()
+    def switch_level(self, level_name):
+        """Show another level; robots on other levels keep their state"""
+        self.fleet_manager.switch_level(level_name)
+        self.redraw_level()
+        self.log_event(f"Switched to level {level_name}")
+
+    def redraw_level(self):
+        """Redraw the current level and the robots on it"""
+        level_name = self.fleet_manager.level_name
+        self.vertices = {}
+        self.robots.clear()
+        self.selected_robot = None
+        self.draw_graph()
+
+        for robot_id, robot in self.fleet_manager.robots.items():
+            if robot.level == level_name and robot_id in self.robot_data:
+                self.create_robot_visuals(
+                    robot_id, robot.current_position, self.robot_data[robot_id]["color"]
+                )
 
     def handle_canvas_click(self, event):
         """Safe click handler with error checking"""
         if not self.vertices:
             return
 
-        # Find nearest vertex
-        vertex_id = min(
-            self.vertices.keys(),
-            key=lambda v: (self.vertices[v][0] - event.x) ** 2
-            + (self.vertices[v][1] - event.y) ** 2,
+        # Find nearest vertex (canvas -> graph coordinates)
+        scale, offset_x, offset_y = self.view_transform
+        vertex_id = self.fleet_manager.graph.nearest_vertex(
+            (event.x - offset_x) / scale, (event.y - offset_y) / scale
         )
 
         try:
@@ -367,6 +395,8 @@ class EnhancedFleetGUI:
         for robot_id, robot in self.fleet_manager.robots.items():
             if robot_id not in self.robots:
                 continue
+            if robot.level != self.fleet_manager.level_name:
+                continue
 
             # Get current position
             x, y = self.vertices[robot.current_position]
@@ -391,9 +421,16 @@ class EnhancedFleetGUI:
     def update_traffic_visuals(self):
         """Show waiting queues without affecting robot colors"""
         self.canvas.delete("queue_marker")
+        graph = self.fleet_manager.graph.snapshot
+        scale, offset_x, offset_y = self.view_transform
         for lane, queue in self.traffic_manager.waiting_queues.items():
             if queue:
                 start, end = lane
+                lane_id = graph.lane_index.get((start, end))
+                if lane_id is None:
+                    lane_id = graph.lane_index.get((end, start))
+                if lane_id is None:
+                    continue  # Not a lane of the level on screen
                 x1, y1 = self.vertices[start]
                 x2, y2 = self.vertices[end]
 
@@ -411,8 +448,8 @@ class EnhancedFleetGUI:
 
                 # Add queue count
                 self.canvas.create_text(
-                    (x1 + x2) / 2,
-                    (y1 + y2) / 2,
+                    offset_x + graph.lane_mid_x[lane_id] * scale,
+                    offset_y + graph.lane_mid_y[lane_id] * scale,
                     text=str(len(queue)),
                     fill="red",
                     font=("Arial", 8, "bold"),
@@ -447,7 +484,7 @@ class EnhancedFleetGUI:
                 active_robots = [
                     r
                     for r in self.fleet_manager.robots.values()
-                    if r.status in ("Moving", "Waiting") and r.path
+                    if r.status in ("Moving", "Waiting") and (r.path or r.legs)
                 ]
                 if not active_robots:
                     time.sleep(0.1)
@@ -534,11 +571,22 @@ class EnhancedFleetGUI:
         self.update_visuals()
         self.update_status_panel()
         self.master.after(1000, self.check_occupancy)
+        self.master.after(1000, self.check_graph_file)
 
     def check_occupancy(self):
         # Check for traffic conflicts and update warnings
         self.master.after(1000, self.check_occupancy)
 
+    def check_graph_file(self):
+        """Pick up edits of the graph file without restarting"""
+        try:
+            if self.fleet_manager.check_graph_file():
+                self.redraw_level()
+                self.log_event("Graph file reloaded")
+        finally:
+            # Keep watching even if this edit could not be applied
+            self.master.after(1000, self.check_graph_file)
+
     def zoom_graph(self, event):
         # Zoom functionality
         pass
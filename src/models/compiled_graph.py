@@ -0,0 +1,207 @@
+import json
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+
+from src.utils.helpers import write_atomically
+
+MAGIC = b"NAVBIN"
+FORMAT_VERSION = 3
+
+# Per-lane geometry arrays built by NavGraph._build_lane_geometry
+LANE_GEOMETRY_FIELDS = (
+    "lane_length",
+    "lane_heading",
+    "lane_mid_x",
+    "lane_mid_y",
+    "lane_min_x",
+    "lane_min_y",
+    "lane_max_x",
+    "lane_max_y",
+)
+
+# NavGraph array attributes stored as-is in a compiled level
+ARRAY_FIELDS = (
+    "vertex_x",
+    "vertex_y",
+    "vertex_chargers",
+    "lane_start",
+    "lane_end",
+    "lane_speed",
+    "offsets",
+    "lane_ids",
+    "targets",
+    "in_offsets",
+    "in_lane_ids",
+    "in_sources",
+    *LANE_GEOMETRY_FIELDS,
+)
+
+ALIGNMENT = 8
+
+
+def _typecode(values):
+    """Typecode of an array, bytearray or memoryview."""
+    return getattr(values, "typecode", None) or memoryview(values).format
+
+
+def _aligned(size):
+    return (size + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class StringTable(Sequence):
+    """Strings packed into one UTF-8 blob with an offsets array.
+
+    Strings are only decoded when accessed, so a memory-mapped table costs
+    nothing until it is used.
+    """
+
+    def __init__(self, blob, offsets):
+        self._blob = blob
+        self._offsets = offsets
+
+    @staticmethod
+    def pack(strings):
+        """Returns (blob, offsets) for a sequence of strings."""
+        encoded = [string.encode("utf-8") for string in strings]
+        offsets = array("i", [0])
+        for chunk in encoded:
+            offsets.append(offsets[-1] + len(chunk))
+        return b"".join(encoded), offsets
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return bytes(self._blob[start:end]).decode("utf-8")
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+
+class LanePropertyTable(Sequence):
+    """Per-lane property dicts decoded from a table of unique JSON strings."""
+
+    def __init__(self, strings, property_ids):
+        self._strings = strings
+        self._property_ids = property_ids
+
+    def __getitem__(self, lane_id):
+        if isinstance(lane_id, slice):
+            return [self[i] for i in range(*lane_id.indices(len(self)))]
+        return json.loads(self._strings[self._property_ids[lane_id]])
+
+    def __len__(self):
+        return len(self._property_ids)
+
+
+def save_compiled(path, graph):
+    """Write the arrays, names and lane properties of a NavGraph level."""
+    name_blob, name_offsets = StringTable.pack(graph.vertex_names)
+
+    unique_properties = {}
+    property_ids = array("i")
+    for properties in graph.lane_properties:
+        encoded = json.dumps(properties, sort_keys=True)
+        if encoded not in unique_properties:
+            unique_properties[encoded] = len(unique_properties)
+        property_ids.append(unique_properties[encoded])
+    property_blob, property_offsets = StringTable.pack(list(unique_properties))
+
+    sections = [(field, getattr(graph, field)) for field in ARRAY_FIELDS]
+    sections += [
+        ("name_blob", name_blob),
+        ("name_offsets", name_offsets),
+        ("property_blob", property_blob),
+        ("property_offsets", property_offsets),
+        ("lane_property_ids", property_ids),
+    ]
+
+    layout = {}
+    position = 0
+    for name, values in sections:
+        view = memoryview(values)
+        layout[name] = [_typecode(values), position, len(view), view.itemsize]
+        position = _aligned(position + view.nbytes)
+
+    header = json.dumps(
+        {
+            "format": FORMAT_VERSION,
+            "byteorder": sys.byteorder,
+            "source_hash": graph.source_hash,
+            "level": graph.level_name,
+            "lane_conflicts": graph.lane_conflicts,
+            "sections": layout,
+        }
+    ).encode("utf-8")
+    data_start = _aligned(len(MAGIC) + 4 + len(header))
+
+    def write(file):
+        file.write(MAGIC)
+        file.write(struct.pack("<I", len(header)))
+        file.write(header)
+        for name, values in sections:
+            file.write(b"\0" * (data_start + layout[name][1] - file.tell()))
+            file.write(memoryview(values))
+
+    # Never rewrite in place: other processes may have the file mapped
+    write_atomically(path, write)
+
+
+def load_compiled(path, source_hash=None):
+    """Memory-map a compiled level written by save_compiled.
+
+    Returns a dict of NavGraph attributes whose arrays are zero-copy views
+    into the (copy-on-write) mapping, or None if the file is missing, was
+    written by another format version or machine, or is out of date.
+    """
+    try:
+        with open(path, "rb") as file:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        if mapping[: len(MAGIC)] != MAGIC:
+            return None
+        (header_size,) = struct.unpack_from("<I", mapping, len(MAGIC))
+        header_end = len(MAGIC) + 4 + header_size
+        header = json.loads(mapping[len(MAGIC) + 4 : header_end].decode("utf-8"))
+        if (
+            header["format"] != FORMAT_VERSION
+            or header["byteorder"] != sys.byteorder
+            or (source_hash and header["source_hash"] != source_hash)
+        ):
+            return None
+
+        data_start = _aligned(header_end)
+        view = memoryview(mapping)
+        sections = {}
+        for name, (typecode, offset, count, itemsize) in header["sections"].items():
+            if array(typecode).itemsize != itemsize:
+                return None
+            start = data_start + offset
+            section = view[start : start + count * itemsize]
+            if len(section) != count * itemsize:
+                return None  # Truncated file
+            sections[name] = section.cast(typecode)
+    except (ValueError, KeyError, TypeError, struct.error):
+        return None
+
+    attributes = {field: sections[field] for field in ARRAY_FIELDS}
+    attributes["level_name"] = header["level"]
+    attributes["lane_conflicts"] = header["lane_conflicts"]
+    attributes["vertex_names"] = StringTable(
+        sections["name_blob"], sections["name_offsets"]
+    )
+    attributes["lane_properties"] = LanePropertyTable(
+        StringTable(sections["property_blob"], sections["property_offsets"]),
+        sections["lane_property_ids"],
+    )
+    return attributes
@@ -0,0 +1,619 @@
+import copy
+import logging
+import math
+from array import array
+from collections.abc import Mapping
+from types import MappingProxyType
+
+from src.models.spatial_index import GridIndex
+from src.utils import search
+from src.utils.components import strong_components, weak_components
+from src.utils.helpers import build_csr
+
+logger = logging.getLogger("NavGraph")
+
+
+class VertexTable(Mapping):
+    """Read-only ``{vertex_id: {"x", "y", "name", "is_charger"}}`` view.
+
+    Vertex data lives in the parallel arrays of the owning snapshot; the
+    per-vertex dicts are only built when a vertex is looked up.
+    """
+
+    def __init__(self, graph):
+        self._graph = graph
+
+    def __getitem__(self, vertex):
+        if vertex not in self:
+            raise KeyError(vertex)
+        graph = self._graph
+        return {
+            "x": graph.vertex_x[vertex],
+            "y": graph.vertex_y[vertex],
+            "name": graph.vertex_names[vertex],
+            "is_charger": bool(graph.vertex_chargers[vertex]),
+        }
+
+    def __contains__(self, vertex):
+        return isinstance(vertex, int) and 0 <= vertex < len(self._graph.vertex_x)
+
+    def __iter__(self):
+        return iter(range(len(self._graph.vertex_x)))
+
+    def __len__(self):
+        return len(self._graph.vertex_x)
+
+
+class GraphSnapshot:
+    """Immutable state of one level at one generation.
+
+    Holds the vertex, lane, CSR and geometry arrays, the lane and spatial
+    indexes and the runtime lane state (closures and speed overrides).
+    A published snapshot is never modified: changes build a new snapshot
+    with a higher generation that shares every array the change leaves
+    alone, so readers can keep using the one they started with. Values
+    derived from lane costs are cached per snapshot; two threads filling
+    the same cache entry compute the same value.
+    """
+
+    def __init__(
+        self,
+        json_path,
+        level_name,
+        source_hash,
+        generation=1,
+        data=None,
+        compiled=None,
+    ):
+        """Builds a level from parsed nav graph JSON (data) or from the
+        attributes of a compiled level (see load_compiled)."""
+        self._load(json_path, level_name, source_hash, generation, data, compiled)
+        self._index_lanes()
+
+    @classmethod
+    def reload(cls, previous, source_hash, data=None, compiled=None):
+        """Returns (snapshot, changed) for an edited source file.
+
+        The new level replaces previous; changed holds the (start, end) of
+        every lane added, removed, moved or with other properties. Indexes
+        and shared structures previous still has right are reused (see
+        _index_changes) and its runtime lane state carries over to the
+        lanes that remain.
+        """
+        snapshot = cls.__new__(cls)
+        snapshot._load(
+            previous.json_path,
+            previous.level_name,
+            source_hash,
+            previous.generation + 1,
+            data,
+            compiled,
+        )
+        return snapshot, snapshot._index_changes(previous)
+
+    def _load(self, json_path, level_name, source_hash, generation, data, compiled):
+        self.json_path = json_path
+        self.level_name = level_name
+        self.source_hash = source_hash
+        self.generation = generation
+        self.vertices = VertexTable(self)
+        if compiled is not None:
+            for name, values in compiled.items():
+                setattr(self, name, values)
+        else:
+            self._load_level_data(data)
+
+    def _load_level_data(self, data):
+        """Builds the vertex and lane arrays from parsed nav graph JSON."""
+        # Check if the specified level exists
+        if self.level_name not in data["levels"]:
+            available_levels = list(data["levels"].keys())
+            raise ValueError(
+                f"Level '{self.level_name}' not found. "
+                f"Available levels: {available_levels}"
+            )
+
+        level = data["levels"][self.level_name]
+        vertex_count = len(level["vertices"])
+
+        # Vertex coordinates and properties as parallel arrays
+        self.vertex_x = array("d")
+        self.vertex_y = array("d")
+        self.vertex_names = []
+        self.vertex_chargers = bytearray(vertex_count)
+
+        for i, vertex in enumerate(level["vertices"]):
+            # Handle both tuple and dict formats
+            if isinstance(vertex, (list, tuple)):
+                x, y = vertex[:2]
+                properties = vertex[2] if len(vertex) > 2 else {}
+            else:  # Assume dict format
+                x = vertex["x"]
+                y = vertex["y"]
+                properties = vertex.get("properties", {})
+
+            self.vertex_x.append(x)
+            self.vertex_y.append(y)
+            self.vertex_names.append(properties.get("name", ""))
+            self.vertex_chargers[i] = bool(properties.get("is_charger", False))
+
+        # Lane table: one entry per directed lane, ids are stable per file
+        self.lane_start = array("i")
+        self.lane_end = array("i")
+        self.lane_speed = array("d")
+        self.lane_properties = []
+        self.lane_conflicts = []
+        lane_ids = {}  # (start, end) -> lane id, to merge duplicate entries
+        reverse_lanes = []  # Lanes marked "bidirectional" in the file
+
+        for lane in level["lanes"]:
+            # Handle both tuple and dict formats
+            if isinstance(lane, (list, tuple)):
+                start, end = lane[:2]
+                properties = lane[2] if len(lane) > 2 else {}
+            else:  # Assume dict format
+                start = lane["start"]
+                end = lane["end"]
+                properties = lane.get("properties", {})
+
+            if start not in self.vertices or end not in self.vertices:
+                raise ValueError(
+                    f"Lane {start} -> {end} references an unknown vertex "
+                    f"in level '{self.level_name}'"
+                )
+
+            if properties.get("bidirectional"):
+                reverse_lanes.append((end, start, properties))
+
+            if (start, end) in lane_ids:
+                self._merge_duplicate_lane(lane_ids[(start, end)], properties)
+                continue
+
+            # Each entry is one directed lane; two-way aisles list both ways
+            lane_ids[(start, end)] = len(self.lane_start)
+            self._append_lane(start, end, properties)
+
+        for start, end, properties in reverse_lanes:
+            if (start, end) not in lane_ids:
+                lane_ids[(start, end)] = len(self.lane_start)
+                self._append_lane(start, end, properties)
+
+        for conflict in self.lane_conflicts:
+            logger.warning(
+                "Level '%s': lane %s -> %s is listed more than once with "
+                "different '%s' (kept %r, ignored %r)",
+                self.level_name,
+                conflict["start"],
+                conflict["end"],
+                conflict["property"],
+                conflict["kept"],
+                conflict["ignored"],
+            )
+
+        # Lanes leaving v are lane_ids[offsets[v]:offsets[v + 1]]
+        self.offsets, self.lane_ids = build_csr(vertex_count, self.lane_start)
+        self.targets = array("i", (self.lane_end[i] for i in self.lane_ids))
+
+        # Lanes entering v are in_lane_ids[in_offsets[v]:in_offsets[v + 1]]
+        self.in_offsets, self.in_lane_ids = build_csr(vertex_count, self.lane_end)
+        self.in_sources = array("i", (self.lane_start[i] for i in self.in_lane_ids))
+
+        self._build_lane_geometry()
+
+    def _build_lane_geometry(self):
+        """Per-lane length, heading (radians from +x), midpoint and bounding
+        box, computed once so planners and renderers never redo the trig."""
+        xs, ys = self.vertex_x, self.vertex_y
+        self.lane_length = array("d")
+        self.lane_heading = array("d")
+        self.lane_mid_x = array("d")
+        self.lane_mid_y = array("d")
+        self.lane_min_x = array("d")
+        self.lane_min_y = array("d")
+        self.lane_max_x = array("d")
+        self.lane_max_y = array("d")
+        for start, end in zip(self.lane_start, self.lane_end):
+            x1, y1, x2, y2 = xs[start], ys[start], xs[end], ys[end]
+            self.lane_length.append(math.hypot(x2 - x1, y2 - y1))
+            self.lane_heading.append(math.atan2(y2 - y1, x2 - x1))
+            self.lane_mid_x.append((x1 + x2) / 2)
+            self.lane_mid_y.append((y1 + y2) / 2)
+            self.lane_min_x.append(min(x1, x2))
+            self.lane_min_y.append(min(y1, y2))
+            self.lane_max_x.append(max(x1, x2))
+            self.lane_max_y.append(max(y1, y2))
+
+    def _append_lane(self, start, end, properties):
+        """Adds one directed lane to the lane table."""
+        self.lane_start.append(start)
+        self.lane_end.append(end)
+        self.lane_speed.append(properties.get("speed_limit", 1))
+        self.lane_properties.append(dict(properties))
+
+    def _merge_duplicate_lane(self, lane_id, properties):
+        """Merges a repeated lane entry; the first listed value of a property
+        wins and differing values are recorded in lane_conflicts."""
+        kept = self.lane_properties[lane_id]
+        for name, value in properties.items():
+            if name not in kept:
+                kept[name] = value
+                if name == "speed_limit":
+                    self.lane_speed[lane_id] = value
+            elif kept[name] != value:
+                self.lane_conflicts.append(
+                    {
+                        "start": self.lane_start[lane_id],
+                        "end": self.lane_end[lane_id],
+                        "property": name,
+                        "kept": kept[name],
+                        "ignored": value,
+                    }
+                )
+
+    def _index_lanes(self):
+        """Builds the lane and spatial indexes and the initial lane state."""
+        # (start, end) -> lane id; lanes are unique per ordered pair
+        self.lane_index = {
+            (start, end): lane_id
+            for lane_id, (start, end) in enumerate(zip(self.lane_start, self.lane_end))
+        }
+
+        self.spatial_index = GridIndex(self.vertex_x, self.vertex_y)
+
+        self.lane_closed = bytes(len(self.lane_start))
+        self.closed_lane_count = 0
+        # lane id -> speed limit set at runtime
+        self.speed_overrides = MappingProxyType({})
+        self.faster_lane_count = 0  # Overrides faster than the source file
+        # lane id -> CongestionProfile scaling its "time" cost by time of day
+        self.lane_profiles = MappingProxyType({})
+        self.min_profile_factor = 1.0  # Lower bound on every lane's factor
+
+        # Built from the source file, so shared by every later generation
+        self._all_pairs = {}  # cost model -> AllPairsTable
+        self._hierarchies = {}  # cost model -> ContractionHierarchy
+        self._landmarks = {}  # cost model -> LandmarkTable
+        # Kept up to date with lane changes, also shared
+        self._planners = {}  # (destination, cost model) -> IncrementalPlanner
+        self._clusters = {}  # cost model -> ClusterHierarchy
+
+        self._components = None
+        self._exact_components = None
+        self.components()
+        self._reset_caches()
+
+    def _index_changes(self, previous):
+        """Like _index_lanes for a level reloaded over previous; returns the
+        (start, end) of the lanes that changed.
+
+        The lane index, spatial index and component labels are shared when
+        their inputs are unchanged, and the spatial index is otherwise only
+        refiled for moved vertices. Planners and cluster hierarchies are
+        kept (and repaired by the caller) while the vertices and the lane
+        list are the same; tables built from the source file are kept for
+        the cost models the edit cannot affect.
+        """
+        xs, ys = self.vertex_x, self.vertex_y
+        old_xs, old_ys = previous.vertex_x, previous.vertex_y
+        moved = {
+            vertex
+            for vertex in range(min(len(xs), len(old_xs)))
+            if xs[vertex] != old_xs[vertex] or ys[vertex] != old_ys[vertex]
+        }
+        moved.update(range(min(len(xs), len(old_xs)), max(len(xs), len(old_xs))))
+
+        keys = list(zip(self.lane_start, self.lane_end))
+        same_lanes = keys == list(previous.lane_index)
+        if same_lanes:
+            self.lane_index = previous.lane_index
+        else:
+            self.lane_index = {key: lane_id for lane_id, key in enumerate(keys)}
+
+        if moved:
+            self.spatial_index = previous.spatial_index.updated(xs, ys, moved)
+        else:
+            self.spatial_index = previous.spatial_index
+
+        changed = set(self.lane_index).symmetric_difference(previous.lane_index)
+        speeds_changed = False
+        for key, lane_id in self.lane_index.items():
+            old = previous.lane_index.get(key)
+            if old is None:
+                continue
+            if key[0] in moved or key[1] in moved:
+                changed.add(key)
+            elif self.lane_properties[lane_id] != previous.lane_properties[old]:
+                changed.add(key)
+                if self.lane_speed[lane_id] != previous.lane_speed[old]:
+                    speeds_changed = True
+
+        # Runtime lane state follows the lanes that remain
+        self._set_lane_state(previous.lane_state())
+
+        if same_lanes and not moved:
+            # Lane ids and geometry stand: repair instead of rebuilding
+            self._planners = previous._planners
+            self._clusters = previous._clusters
+            unaffected = ("hops", "distance") if speeds_changed else search.COST_MODELS
+            self._all_pairs, self._hierarchies, self._landmarks = (
+                {
+                    cost_model: table
+                    for cost_model, table in tables.items()
+                    if cost_model in unaffected
+                }
+                for tables in (
+                    previous._all_pairs,
+                    previous._hierarchies,
+                    previous._landmarks,
+                )
+            )
+        else:
+            self._all_pairs = {}
+            self._hierarchies = {}
+            self._landmarks = {}
+            self._planners = {}
+            self._clusters = {}
+
+        self._components = self._exact_components = None
+        if (
+            same_lanes
+            and len(xs) == len(old_xs)  # Labels are per vertex
+            and self.lane_closed == previous.lane_closed
+        ):
+            self._components = previous._components
+            self._exact_components = previous._exact_components
+        self.components()
+        self._reset_caches()
+        return changed
+
+    def lane_state(self):
+        """Runtime lane state keyed by (start, end) rather than lane id, so
+        that it applies to another load of the level (see with_lane_state):
+        ``{"closed": [key], "speed_overrides": {key: speed},
+        "lane_profiles": {key: profile}}``."""
+        starts, ends = self.lane_start, self.lane_end
+        closed = []
+        if self.closed_lane_count:
+            closed = [
+                (starts[lane_id], ends[lane_id])
+                for lane_id, is_closed in enumerate(self.lane_closed)
+                if is_closed
+            ]
+        return {
+            "closed": closed,
+            "speed_overrides": {
+                (starts[lane_id], ends[lane_id]): speed
+                for lane_id, speed in self.speed_overrides.items()
+            },
+            "lane_profiles": {
+                (starts[lane_id], ends[lane_id]): profile
+                for lane_id, profile in self.lane_profiles.items()
+            },
+        }
+
+    def with_lane_state(self, state):
+        """Returns the next generation with a lane_state() applied."""
+        # Lanes may reopen: relabelled on next use
+        snapshot = self.evolve(_components=None, _exact_components=None)
+        snapshot._set_lane_state(state)
+        return snapshot
+
+    def _set_lane_state(self, state):
+        """Sets the runtime lane state from a lane_state(); lanes the level
+        no longer has are skipped, as are overrides of a speed the source
+        file now sets itself."""
+        lane_index = self.lane_index
+        lane_closed = bytearray(len(self.lane_start))
+        for key in state["closed"]:
+            if key in lane_index:
+                lane_closed[lane_index[key]] = 1
+        self.lane_closed = bytes(lane_closed)
+        self.closed_lane_count = sum(lane_closed)
+
+        overrides, profiles = {}, {}
+        for key, speed in state["speed_overrides"].items():
+            lane_id = lane_index.get(key)
+            if lane_id is not None and self.lane_speed[lane_id] != speed:
+                overrides[lane_id] = speed
+        for key, profile in state["lane_profiles"].items():
+            lane_id = lane_index.get(key)
+            if lane_id is not None:
+                profiles[lane_id] = profile
+        self.speed_overrides = MappingProxyType(overrides)
+        self.faster_lane_count = sum(
+            search.lane_speed(speed) > search.lane_speed(self.lane_speed[lane_id])
+            for lane_id, speed in overrides.items()
+        )
+        self.lane_profiles = MappingProxyType(profiles)
+        self.min_profile_factor = min(
+            [1.0, *(profile.min_factor for profile in profiles.values())]
+        )
+        self._check_fifo(profiles)
+
+    def _reset_caches(self):
+        """Drop everything derived from lane costs."""
+        self._lane_costs = {}  # cost model -> per-lane cost array
+        self._heuristic_scales = {}  # cost model -> A* distance scale
+
+    def evolve(self, **changes):
+        """Returns the next generation with changes applied.
+
+        Arrays, indexes and precomputed tables are shared, not copied.
+        """
+        snapshot = copy.copy(self)
+        snapshot.__dict__.update(changes)
+        snapshot.generation = self.generation + 1
+        snapshot.vertices = VertexTable(snapshot)
+        snapshot._reset_caches()
+        return snapshot
+
+    def with_lanes_closed(self, lane_ids, closed):
+        """Returns the next generation with lanes closed (or reopened).
+
+        Closing keeps the component labels (see components); reopening
+        has them recomputed on next use.
+        """
+        lane_closed = bytearray(self.lane_closed)
+        for lane_id in lane_ids:
+            lane_closed[lane_id] = closed
+        labels = {"_exact_components": None}
+        if not closed:
+            labels["_components"] = None
+        return self.evolve(
+            lane_closed=bytes(lane_closed),
+            closed_lane_count=sum(lane_closed),
+            **labels,
+        )
+
+    def with_speed_limit(self, lane_ids, speed_limit):
+        """Returns (snapshot, changed lane ids) for a new speed limit.
+
+        Setting the source file's speed again removes the override.
+        """
+        overrides = dict(self.speed_overrides)
+        changed = []
+        for lane_id in lane_ids:
+            if self.speed(lane_id) == speed_limit:
+                continue
+            if self.lane_speed[lane_id] == speed_limit:
+                del overrides[lane_id]
+            else:
+                overrides[lane_id] = speed_limit
+            changed.append(lane_id)
+        if not changed:
+            return self, changed
+
+        # Landmark bounds only hold while no lane is faster than in the file
+        faster_lane_count = sum(
+            search.lane_speed(speed) > search.lane_speed(self.lane_speed[lane_id])
+            for lane_id, speed in overrides.items()
+        )
+        snapshot = self.evolve(
+            speed_overrides=MappingProxyType(overrides),
+            faster_lane_count=faster_lane_count,
+        )
+        snapshot._check_fifo(changed)
+        return snapshot, changed
+
+    def with_lane_profiles(self, profiles):
+        """Returns the next generation with {lane id: profile} attached;
+        a profile of None detaches the lane's profile."""
+        lane_profiles = dict(self.lane_profiles)
+        for lane_id, profile in profiles.items():
+            if profile is None:
+                lane_profiles.pop(lane_id, None)
+            else:
+                lane_profiles[lane_id] = profile
+        snapshot = self.evolve(
+            lane_profiles=MappingProxyType(lane_profiles),
+            # Lanes without a profile keep factor 1
+            min_profile_factor=min(
+                [1.0, *(profile.min_factor for profile in lane_profiles.values())]
+            ),
+        )
+        snapshot._check_fifo(profiles)
+        return snapshot
+
+    def _check_fifo(self, lane_ids):
+        """Raise ValueError if a profiled lane would break FIFO order at its
+        current speed (closed lanes count as open)."""
+        for lane_id in lane_ids:
+            profile = self.lane_profiles.get(lane_id)
+            if profile is not None:
+                base = search.lane_cost(self, lane_id, "time", self.speed(lane_id))
+                profile.check_fifo(
+                    base, f"{self.lane_start[lane_id]} -> {self.lane_end[lane_id]}"
+                )
+
+    def speed(self, lane_id):
+        """Current speed limit of a lane, including runtime overrides."""
+        return self.speed_overrides.get(lane_id, self.lane_speed[lane_id])
+
+    def lanes_between(self, start, end):
+        """Returns the ids of every lane from start to end."""
+        if start not in self.vertices:
+            return []
+        return [
+            self.lane_ids[i]
+            for i in range(self.offsets[start], self.offsets[start + 1])
+            if self.targets[i] == end
+        ]
+
+    def costs_modified(self, cost_model):
+        """True if lane costs differ from those of the source file."""
+        return bool(
+            self.closed_lane_count or (cost_model == "time" and self.speed_overrides)
+        )
+
+    def lane_cost(self, lane_id, cost_model):
+        """Returns the current cost of one lane (inf while it is closed)."""
+        if self.lane_closed[lane_id]:
+            return search.INF
+        return search.lane_cost(self, lane_id, cost_model, self.speed(lane_id))
+
+    def get_lane_costs(self, cost_model):
+        """Returns the per-lane cost array for a cost model (cached)."""
+        costs = self._lane_costs.get(cost_model)
+        if costs is None:
+            costs = search.lane_costs(self, cost_model)
+            if cost_model == "time":
+                for lane_id in self.speed_overrides:
+                    costs[lane_id] = self.lane_cost(lane_id, cost_model)
+            if self.closed_lane_count:
+                for lane_id, closed in enumerate(self.lane_closed):
+                    if closed:
+                        costs[lane_id] = search.INF
+            self._lane_costs[cost_model] = costs
+        return costs
+
+    def get_heuristic_scale(self, cost_model):
+        """Returns the A* straight-line distance scale for a cost model (cached)."""
+        scale = self._heuristic_scales.get(cost_model)
+        if scale is None:
+            scale = search.heuristic_scale(self, cost_model)
+            if cost_model == "time" and self.speed_overrides:
+                fastest = max(map(search.lane_speed, self.speed_overrides.values()))
+                scale = min(scale, 1.0 / fastest)
+            self._heuristic_scales[cost_model] = scale
+        return scale
+
+    def components(self):
+        """Returns (strong, weak): per-vertex component ids, for unreachable.
+
+        Strong ids are in reverse topological order of the component graph
+        (see strong_components). The labels may have been computed over
+        more open lanes: closing lanes only removes routes, so they still
+        prove unreachability, and relabelling a large level on every
+        closure would cost more than the searches it saves. Reopening lanes
+        has them recomputed on next use.
+        """
+        components = self._components
+        if components is None:
+            components = self.exact_components()
+        return components
+
+    def exact_components(self):
+        """Like components, but always labelled over the currently open
+        lanes (computed on first use after a closure)."""
+        components = self._exact_components
+        if components is None:
+            if self.closed_lane_count:
+                lane_open = lambda lane_id: not self.lane_closed[lane_id]
+            else:
+                lane_open = None
+            components = (
+                strong_components(self, lane_open),
+                weak_components(self, lane_open),
+            )
+            self._components = self._exact_components = components
+        return components
+
+    def unreachable(self, start, destination):
+        """True if component labels prove there is no route (O(1)).
+
+        False means a route may exist: the labels settle reachability
+        within a strong component and between weak components, but not
+        every case in between.
+        """
+        strong, weak = self.components()
+        return weak[start] != weak[destination] or strong[destination] > strong[start]
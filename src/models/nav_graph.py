@@ -1,123 +1,950 @@
+import hashlib
 import json
-import heapq
+import sys
+from collections import OrderedDict
+from threading import Lock
+
+from src.models import compiled_graph
+from src.models.compiled_graph import (
+    LANE_GEOMETRY_FIELDS,
+    load_compiled,
+    save_compiled,
+)
+from src.models.graph_snapshot import GraphSnapshot
+from src.utils.helpers import artifact_path, remove_stale_artifacts
+from src.utils import all_pairs, contraction, search, time_dependent, turns
+from src.utils.all_pairs import AllPairsTable
+from src.utils.contraction import ContractionHierarchy
+from src.utils.hierarchical import ClusterHierarchy
+from src.utils.incremental import IncrementalPlanner
+from src.utils.k_shortest import k_shortest_paths
+from src.utils.landmarks import LandmarkTable
+
+
+def _snapshot_field(name, doc):
+    """Read-only NavGraph property reading name from the current snapshot."""
+    return property(lambda graph: getattr(graph.snapshot, name), doc=doc)
 
 
 class NavGraph:
-    def __init__(self, json_path, level_name="level1"):
+    def __init__(
+        self,
+        json_path,
+        level_name="level1",
+        cost_model="hops",
+        algorithm="dijkstra",
+        path_cache_size=1024,
+        precompute=False,
+        use_compiled=True,
+        cache_dir=None,
+        source_hash=None,
+        source_data=None,
+        turn_penalties=None,
+    ):
         """
         Initialize with path to JSON file and optional level name
         Defaults to 'level1' for backward compatibility
+        cost_model ("hops", "distance" or "time") sets the default path cost
+        algorithm ("dijkstra", "astar", "bidirectional",
+        "bidirectional_astar", "ch" or "hpa") sets the default search
+        path_cache_size bounds the LRU cache of planned paths (0 disables it)
+        precompute builds all-pairs routing tables (see precompute_all_pairs)
+        use_compiled loads/writes the compiled binary form of the level
+        cache_dir holds compiled levels and tables (default: next to the JSON)
+        source_hash/source_data: see load_graph
+        turn_penalties (a TurnPenalties) adds turn costs to find_path
+
+        Graph data lives in an immutable GraphSnapshot (see snapshot); the
+        properties below read its public fields from the current one. Pin
+        graph.snapshot to read several of them from one version.
         """
-        self.vertices = {}
-        self.edges = {}
-        self.level_name = level_name
-        self.load_graph(json_path)
-
-    def load_graph(self, json_path):
-        """Loads the navigation graph from a JSON file for the specified level"""
-        with open(json_path, "r") as file:
-            data = json.load(file)
-
-            # Check if the specified level exists
-            if self.level_name not in data["levels"]:
-                available_levels = list(data["levels"].keys())
-                raise ValueError(
-                    f"Level '{self.level_name}' not found. "
-                    f"Available levels: {available_levels}"
-                )
+        search.check_cost_model(cost_model)
+        search.check_algorithm(algorithm)
+        self.cost_model = cost_model
+        self.algorithm = algorithm
+        self.use_compiled = use_compiled
+        self.cache_dir = cache_dir
+        self.turn_penalties = turn_penalties  # See set_turn_penalties
+
+        # Current GraphSnapshot; replaced, never modified, by writers
+        self.snapshot = None
+        self._write_lock = Lock()  # Serializes writers, never taken by queries
+
+        # (start, destination, cost_model) -> (path, cost), least recent first
+        self.path_cache_size = path_cache_size
+        self._path_cache = OrderedDict()
+        self._path_cache_version = 0
+        self._path_cache_lock = Lock()
+        self.path_cache_hits = 0
+        self.path_cache_misses = 0
+
+        # (start, destination, cost_model) -> alternative routes, same bounds
+        self._route_cache = OrderedDict()
+        self._route_cache_version = 0
+
+        self.load_graph(json_path, source_hash, source_data, level_name)
+        if precompute:
+            self.precompute_all_pairs()
+
+    @property
+    def version(self):
+        """Generation of the current snapshot, bumped on every change to
+        vertices, lanes or lane costs."""
+        return self.snapshot.generation
+
+    json_path = _snapshot_field("json_path", "Path of the source file.")
+    source_hash = _snapshot_field("source_hash", "SHA-256 of the source file.")
+    level_name = _snapshot_field("level_name", "Name of the loaded level.")
+    vertices = _snapshot_field("vertices", "VertexTable: vertex id -> data.")
+    vertex_x = _snapshot_field("vertex_x", "Vertex x coordinates by id.")
+    vertex_y = _snapshot_field("vertex_y", "Vertex y coordinates by id.")
+    vertex_names = _snapshot_field("vertex_names", "Vertex names by id.")
+    lane_start = _snapshot_field("lane_start", "Start vertex by lane id.")
+    lane_end = _snapshot_field("lane_end", "End vertex by lane id.")
+    lane_speed = _snapshot_field("lane_speed", "Source file speed by lane id.")
+    lane_properties = _snapshot_field(
+        "lane_properties", "Source file properties by lane id."
+    )
+    lane_conflicts = _snapshot_field(
+        "lane_conflicts", "Differing properties of repeated lane entries."
+    )
+    lane_index = _snapshot_field("lane_index", "(start, end) -> lane id.")
+    spatial_index = _snapshot_field("spatial_index", "GridIndex of the vertices.")
+    lane_closed = _snapshot_field("lane_closed", "1 for closed lanes, by lane id.")
+    closed_lane_count = _snapshot_field(
+        "closed_lane_count", "Number of closed lanes."
+    )
+    speed_overrides = _snapshot_field(
+        "speed_overrides", "Lane id -> speed limit set at runtime."
+    )
+    lane_profiles = _snapshot_field(
+        "lane_profiles", "Lane id -> CongestionProfile of its time cost."
+    )
+
+    @classmethod
+    def compile(cls, json_path, cache_dir=None):
+        """Compile every level of a nav graph JSON file to the binary format.
+
+        Returns the paths of the compiled files. Loading a level afterwards
+        memory-maps its compiled file instead of parsing the JSON.
+        """
+        with open(json_path, "rb") as file:
+            level_names = list(json.loads(file.read())["levels"])
+        return [
+            cls(json_path, level_name, cache_dir=cache_dir).compiled_path()
+            for level_name in level_names
+        ]
+
+    def compiled_path(self):
+        """Location of the compiled binary form of the loaded level."""
+        snapshot = self.snapshot
+        return self._compiled_path(
+            snapshot.json_path, snapshot.level_name, snapshot.source_hash
+        )
+
+    def _compiled_path(self, json_path, level_name, source_hash):
+        return artifact_path(
+            json_path,
+            level_name,
+            "graph",
+            compiled_graph.FORMAT_VERSION,
+            source_hash,
+            "navbin",
+            self.cache_dir,
+        )
+
+    def load_graph(
+        self, json_path, source_hash=None, source_data=None, level_name=None
+    ):
+        """Loads the navigation graph from a JSON file for the specified level
+
+        With use_compiled, a compiled binary copy of the level is memory-mapped
+        when its recorded hash matches the JSON file; otherwise the JSON is
+        parsed and the compiled copy is (re)written. Callers that already
+        read the file (see Site) pass its SHA-256 and parsed contents
+        instead of having it read again. level_name defaults to the level
+        loaded now.
+
+        The level is built as a new snapshot and published once complete;
+        queries already running finish on the snapshot they started with.
+        """
+        level_name = level_name or self.snapshot.level_name
+        source_hash, compiled, source_data = self._read_source(
+            json_path, level_name, source_hash, source_data
+        )
+        with self._write_lock:
+            generation = self.snapshot.generation + 1 if self.snapshot else 1
+            snapshot = GraphSnapshot(
+                json_path, level_name, source_hash, generation, source_data, compiled
+            )
+            if compiled is None:
+                self._save_compiled(snapshot)
+            self.snapshot = snapshot
+
+    def reload(self, source_hash=None, source_data=None):
+        """Picks up edits of the JSON file, applying only what changed.
+
+        Lanes keep their closures, speed overrides and congestion profiles;
+        planners, indexes and tables are kept or refiled where the edit
+        allows it (see GraphSnapshot.reload). source_hash/source_data: see
+        load_graph. Returns the (start, end) of the lanes added, removed or
+        changed; an unchanged file returns an empty set.
+        """
+        snapshot = self.snapshot
+        json_path, level_name = snapshot.json_path, snapshot.level_name
+        if source_hash is None:
+            with open(json_path, "rb") as file:
+                raw = file.read()
+            source_hash = hashlib.sha256(raw).hexdigest()
+            if source_hash != snapshot.source_hash:
+                source_data = json.loads(raw)
+        if source_hash == snapshot.source_hash:
+            return set()
 
-            level = data["levels"][self.level_name]
-
-            # Load vertices with optional properties
-            for i, vertex in enumerate(level["vertices"]):
-                # Handle both tuple and dict formats
-                if isinstance(vertex, (list, tuple)):
-                    x, y = vertex[:2]
-                    properties = vertex[2] if len(vertex) > 2 else {}
-                else:  # Assume dict format
-                    x = vertex["x"]
-                    y = vertex["y"]
-                    properties = vertex.get("properties", {})
-
-                self.vertices[i] = {
-                    "x": x,
-                    "y": y,
-                    "name": properties.get("name", ""),
-                    "is_charger": properties.get("is_charger", False),
-                }
-
-            # Initialize adjacency list
-            self.edges = {v: [] for v in self.vertices}
-
-            # Load lanes
-            for lane in level["lanes"]:
-                # Handle both tuple and dict formats
-                if isinstance(lane, (list, tuple)):
-                    start, end = lane[:2]
-                    properties = lane[2] if len(lane) > 2 else {}
-                else:  # Assume dict format
-                    start = lane["start"]
-                    end = lane["end"]
-                    properties = lane.get("properties", {})
-
-                speed_limit = properties.get("speed_limit", 1)
-
-                # Add bidirectional edges
-                self.edges[start].append((end, speed_limit))
-                self.edges[end].append((start, speed_limit))
-
-    # ... (keep all other existing methods unchanged)
+        with self._write_lock:
+            snapshot, changed, parsed = self._prepare_reload(source_hash, source_data)
+            self._commit_reload(snapshot, changed, parsed)
+        return changed
+
+    def _prepare_reload(self, source_hash, source_data):
+        """Builds the reloaded snapshot without publishing it.
+
+        Callers hold the write lock. Returns (snapshot, changed, parsed);
+        parsed is True when the level was built from the JSON. A level the
+        file no longer describes correctly raises ValueError.
+        """
+        current = self.snapshot
+        try:
+            source_hash, compiled, source_data = self._read_source(
+                current.json_path, current.level_name, source_hash, source_data
+            )
+            snapshot, changed = GraphSnapshot.reload(
+                current, source_hash, source_data, compiled
+            )
+        except (KeyError, IndexError, TypeError) as error:
+            raise ValueError(
+                f"Level '{current.level_name}' of {current.json_path} is "
+                f"malformed: {error!r}"
+            ) from error
+        return snapshot, changed, compiled is None
+
+    def _commit_reload(self, snapshot, changed, parsed):
+        """Publishes a snapshot from _prepare_reload. Callers hold the write
+        lock they prepared it under."""
+        if parsed:
+            self._save_compiled(snapshot)
+        lane_index = snapshot.lane_index
+        self._publish(
+            snapshot, [lane_index[key] for key in changed if key in lane_index]
+        )
+
+    def _read_source(self, json_path, level_name, source_hash, source_data):
+        """Returns (source_hash, compiled, source_data) to build a level
+        from: the compiled copy when it matches, else the parsed JSON."""
+        raw = None
+        if source_hash is None:
+            with open(json_path, "rb") as file:
+                raw = file.read()
+            source_hash = hashlib.sha256(raw).hexdigest()
+
+        compiled = None
+        if self.use_compiled:
+            compiled = load_compiled(
+                self._compiled_path(json_path, level_name, source_hash), source_hash
+            )
+            if compiled is not None and compiled["level_name"] != level_name:
+                compiled = None
+        if compiled is None and source_data is None:
+            if raw is None:
+                with open(json_path, "rb") as file:
+                    raw = file.read()
+            source_data = json.loads(raw)
+        return source_hash, compiled, source_data
+
+    def _save_compiled(self, snapshot):
+        """Writes the compiled copy of a level parsed from JSON."""
+        if not self.use_compiled:
+            return
+        path = self._compiled_path(
+            snapshot.json_path, snapshot.level_name, snapshot.source_hash
+        )
+        try:
+            save_compiled(path, snapshot)
+            remove_stale_artifacts(path)
+        except OSError:
+            pass  # Read-only location: parse the JSON next time too
+
+    def _publish(self, snapshot, lane_ids):
+        """Make snapshot current and repair planners for changed lanes.
+
+        Callers hold the write lock. Planners and cluster hierarchies are
+        shared by every generation of a level and repaired in place.
+        """
+        self.snapshot = snapshot
+        for planner in list(snapshot._planners.values()):
+            planner.update_lanes(lane_ids, snapshot)
+        for clusters in list(snapshot._clusters.values()):
+            clusters.update_lanes(lane_ids, snapshot)
+
+    def _repaired(self, snapshot, structures, key, build):
+        """Returns structures[key] (planners or cluster hierarchies of the
+        snapshot's level), creating it with build(snapshot).
+
+        It is created under the write lock from the current snapshot, so
+        that no lane change is published between its creation and its
+        registration for repairs.
+        """
+        structure = structures.get(key)
+        if structure is None:
+            with self._write_lock:
+                structure = structures.get(key)
+                if structure is None:
+                    latest = self.snapshot
+                    if latest.lane_index is not snapshot.lane_index:
+                        latest = snapshot  # Level reloaded meanwhile
+                    structure = structures[key] = build(latest)
+        return structure
+
+    def memory_usage(self):
+        """Approximate bytes held by the graph arrays, lane index and caches."""
+        snapshot = self.snapshot
+        total = sum(
+            memoryview(values).nbytes
+            for values in (
+                snapshot.vertex_x,
+                snapshot.vertex_y,
+                snapshot.vertex_chargers,
+                snapshot.lane_start,
+                snapshot.lane_end,
+                snapshot.lane_speed,
+                snapshot.offsets,
+                snapshot.lane_ids,
+                snapshot.targets,
+                snapshot.in_offsets,
+                snapshot.in_lane_ids,
+                snapshot.in_sources,
+                *(getattr(snapshot, field) for field in LANE_GEOMETRY_FIELDS),
+                snapshot.lane_closed,
+            )
+        )
+        total += sys.getsizeof(snapshot.lane_index) + 64 * len(snapshot.lane_index)
+        total += sum(
+            memoryview(costs).nbytes for costs in snapshot._lane_costs.values()
+        )
+        total += sum(
+            memoryview(table.dist).nbytes + memoryview(table.next_hop).nbytes
+            for table in snapshot._all_pairs.values()
+        )
+        return total
 
     def switch_level(self, json_path, new_level_name):
         """Switch to a different level in the same JSON file"""
-        self.level_name = new_level_name
-        self.vertices = {}
-        self.edges = {}
-        self.load_graph(json_path)
+        self.load_graph(json_path, level_name=new_level_name)
 
     def get_vertices(self):
         """Returns all vertices."""
         return self.vertices
 
+    def nearest_vertex(self, x, y):
+        """Returns the vertex closest to the point (x, y)."""
+        return self.spatial_index.nearest(x, y)
+
+    def k_nearest(self, x, y, k):
+        """Returns up to k vertices closest to (x, y), nearest first."""
+        return self.spatial_index.k_nearest(x, y, k)
+
+    def within_radius(self, x, y, radius):
+        """Returns the vertices within radius of (x, y), nearest first."""
+        return self.spatial_index.within_radius(x, y, radius)
+
+    def get_neighbors(self, vertex):
+        """Returns (neighbor, speed_limit) pairs for lanes leaving a vertex."""
+        snapshot = self.snapshot
+        if vertex not in snapshot.vertices:
+            return []
+        first, last = snapshot.offsets[vertex], snapshot.offsets[vertex + 1]
+        return [
+            (snapshot.targets[i], snapshot.speed(snapshot.lane_ids[i]))
+            for i in range(first, last)
+        ]
+
     def get_lanes(self):
         """Returns all lanes with speed limits."""
+        snapshot = self.snapshot
+        offsets, targets = snapshot.offsets, snapshot.targets
+        lane_ids = snapshot.lane_ids
         return [
-            {"start": start, "end": end, "speed_limit": speed}
-            for start in self.edges
-            for end, speed in self.edges[start]
+            {
+                "start": start,
+                "end": targets[i],
+                "speed_limit": snapshot.speed(lane_ids[i]),
+            }
+            for start in range(len(offsets) - 1)
+            for i in range(offsets[start], offsets[start + 1])
         ]
 
+    def get_lane_id(self, start, end):
+        """Returns the id of the lane from start to end, or None."""
+        return self.lane_index.get((start, end))
+
+    def get_lane(self, start, end):
+        """Returns all properties of the lane from start to end, or None."""
+        snapshot = self.snapshot
+        lane_id = snapshot.lane_index.get((start, end))
+        if lane_id is None:
+            return None
+        return {
+            **snapshot.lane_properties[lane_id],
+            "id": lane_id,
+            "start": start,
+            "end": end,
+            "speed_limit": snapshot.speed(lane_id),
+        }
+
+    def get_lane_geometry(self, lane_id):
+        """Returns the precomputed geometry of a lane."""
+        snapshot = self.snapshot
+        return {
+            "length": snapshot.lane_length[lane_id],
+            "heading": snapshot.lane_heading[lane_id],
+            "midpoint": (snapshot.lane_mid_x[lane_id], snapshot.lane_mid_y[lane_id]),
+            "bbox": (
+                snapshot.lane_min_x[lane_id],
+                snapshot.lane_min_y[lane_id],
+                snapshot.lane_max_x[lane_id],
+                snapshot.lane_max_y[lane_id],
+            ),
+        }
+
+    def set_lane_closed(self, start, end, closed=True):
+        """Close (or reopen) the lane from start to end for path planning."""
+        with self._write_lock:
+            snapshot = self.snapshot
+            lane_ids = snapshot.lanes_between(start, end)
+            if not lane_ids:
+                raise ValueError(f"No lane from {start} to {end}")
+
+            if any(snapshot.lane_closed[lane_id] != closed for lane_id in lane_ids):
+                self._publish(snapshot.with_lanes_closed(lane_ids, closed), lane_ids)
+
+    def close_lane(self, start, end):
+        """Close the lane from start to end; planned paths will avoid it."""
+        self.set_lane_closed(start, end, True)
+
+    def reopen_lane(self, start, end):
+        """Reopen a lane previously closed with close_lane."""
+        self.set_lane_closed(start, end, False)
+
+    def restore_lane_state(self, state):
+        """Replaces the closures, speed overrides and congestion profiles of
+        the level with those GraphSnapshot.lane_state saved from an earlier
+        load of it."""
+        with self._write_lock:
+            current = self.snapshot.lane_state()
+            snapshot = self.snapshot.with_lane_state(state)
+            lane_index = snapshot.lane_index
+            keys = {
+                *state["closed"],
+                *state["speed_overrides"],
+                *current["closed"],
+                *current["speed_overrides"],
+            }
+            self._publish(
+                snapshot, [lane_index[key] for key in keys if key in lane_index]
+            )
+
+    def component_info(self):
+        """Summary of the connectivity of the level over open lanes, e.g. to
+        validate a new graph file: component counts, the size of the largest
+        strong component and the vertices outside it."""
+        strong, weak = self.snapshot.exact_components()
+        sizes = {}
+        for label in strong:
+            sizes[label] = sizes.get(label, 0) + 1
+        largest = max(sizes, key=sizes.get, default=None)
+        return {
+            "strongly_connected": len(sizes) <= 1,
+            "strong_components": len(sizes),
+            "weak_components": len(set(weak)),
+            "largest_strong_component": sizes.get(largest, 0),
+            "outside_largest": [
+                vertex for vertex, label in enumerate(strong) if label != largest
+            ],
+        }
+
+    def set_speed_limit(self, start, end, speed_limit):
+        """Change the speed limit of the lane from start to end at runtime.
+
+        The source file is left alone; setting the original speed again
+        removes the override.
+        """
+        with self._write_lock:
+            snapshot = self.snapshot
+            lane_ids = snapshot.lanes_between(start, end)
+            if not lane_ids:
+                raise ValueError(f"No lane from {start} to {end}")
+
+            snapshot, changed = snapshot.with_speed_limit(lane_ids, speed_limit)
+            if changed:
+                self._publish(snapshot, changed)
+
+    def set_lane_profile(self, start, end, profile):
+        """Attach a CongestionProfile to the lane from start to end (None
+        detaches it). Used by find_path_at; other queries are unaffected."""
+        with self._write_lock:
+            snapshot = self.snapshot
+            lane_ids = snapshot.lanes_between(start, end)
+            if not lane_ids:
+                raise ValueError(f"No lane from {start} to {end}")
+            profiles = {lane_id: profile for lane_id in lane_ids}
+            self._publish(snapshot.with_lane_profiles(profiles), [])
+
+    def load_profiles(self, path):
+        """Attach the congestion profiles a profile file lists for this level
+        (see src/utils/time_dependent.py); returns the number of lanes."""
+        lanes = time_dependent.load_profiles(path).get(self.level_name, [])
+        with self._write_lock:
+            snapshot = self.snapshot
+            profiles = {}
+            for start, end, profile in lanes:
+                lane_ids = snapshot.lanes_between(start, end)
+                if not lane_ids:
+                    raise ValueError(f"No lane from {start} to {end}")
+                profiles.update((lane_id, profile) for lane_id in lane_ids)
+            self._publish(snapshot.with_lane_profiles(profiles), [])
+        return len(profiles)
+
     def get_speed_limit(self, start, end):
-        """Retrieve the speed limit between two vertices using get_lanes()."""
-        for lane in self.get_lanes():  # Use the function instead of self.lanes
-            if (lane["start"] == start and lane["end"] == end) or (
-                lane["start"] == end and lane["end"] == start
-            ):
-                return lane["speed_limit"]
-        return None  # No direct connectio
+        """Retrieve the speed limit between two vertices in either direction."""
+        snapshot = self.snapshot
+        lane_id = snapshot.lane_index.get((start, end))
+        if lane_id is None:
+            lane_id = snapshot.lane_index.get((end, start))
+        if lane_id is None:
+            return None  # No direct connection
+        return snapshot.speed(lane_id)
+
+    def lane_cost(self, lane_id, cost_model=None):
+        """Returns the current cost of one lane (inf while it is closed)."""
+        return self.snapshot.lane_cost(lane_id, cost_model or self.cost_model)
+
+    def get_lane_costs(self, cost_model=None):
+        """Returns the per-lane cost array for a cost model (cached)."""
+        return self.snapshot.get_lane_costs(cost_model or self.cost_model)
+
+    def get_heuristic_scale(self, cost_model=None):
+        """Returns the A* straight-line distance scale for a cost model (cached)."""
+        return self.snapshot.get_heuristic_scale(cost_model or self.cost_model)
+
+    def precompute_all_pairs(self, cost_model=None, cache_dir=None):
+        """Build all-pairs distance and next-hop tables for a cost model.
+
+        Tables are saved next to the JSON file (or in cache_dir), keyed by the
+        file's content hash, and reloaded instead of rebuilt when the file is
+        unchanged. While lane costs match the file, find_path, get_shortest_path and
+        get_distance answer from the tables without searching.
+        """
+        cost_model = cost_model or self.cost_model
+        search.check_cost_model(cost_model)
+        snapshot = self.snapshot
+        path = artifact_path(
+            snapshot.json_path,
+            snapshot.level_name,
+            cost_model,
+            all_pairs.FORMAT_VERSION,
+            snapshot.source_hash,
+            "apsp",
+            cache_dir or self.cache_dir,
+        )
+        table = AllPairsTable.load(path, snapshot.source_hash)
+        if table is None or table.vertex_count != len(snapshot.vertices):
+            table = AllPairsTable.build(snapshot, cost_model)
+            try:
+                table.save(path)
+                remove_stale_artifacts(path)
+            except OSError:
+                pass  # Read-only location: keep the table in memory only
+        snapshot._all_pairs[cost_model] = table
+        return table
+
+    def build_contraction_hierarchy(self, cost_model=None, cache_dir=None):
+        """Build the contraction hierarchy used by the "ch" algorithm.
+
+        Like the all-pairs tables, the hierarchy is saved next to the JSON
+        file (or in cache_dir) keyed by the file's content hash, so it is
+        only rebuilt when the graph file changes.
+        """
+        return self._contraction_hierarchy(self.snapshot, cost_model, cache_dir)
+
+    def _contraction_hierarchy(self, snapshot, cost_model=None, cache_dir=None):
+        cost_model = cost_model or self.cost_model
+        search.check_cost_model(cost_model)
+        path = artifact_path(
+            snapshot.json_path,
+            snapshot.level_name,
+            cost_model,
+            contraction.FORMAT_VERSION,
+            snapshot.source_hash,
+            "ch",
+            cache_dir or self.cache_dir,
+        )
+        hierarchy = ContractionHierarchy.load(path, snapshot.source_hash)
+        if hierarchy is None or hierarchy.vertex_count != len(snapshot.vertices):
+            hierarchy = ContractionHierarchy.build(snapshot, cost_model)
+            try:
+                hierarchy.save(path)
+                remove_stale_artifacts(path)
+            except OSError:
+                pass  # Read-only location: keep the hierarchy in memory only
+        snapshot._hierarchies[cost_model] = hierarchy
+        return hierarchy
+
+    def build_cluster_hierarchy(self, cost_model=None, vertices_per_cluster=256):
+        """Build the spatial clusters used by the "hpa" algorithm.
+
+        All in-cluster costs are computed here, so queries start at full
+        speed. Clusters follow lane closures and speed changes: only the
+        clusters containing a changed lane are recomputed, as the change is
+        published.
+        """
+        cost_model = cost_model or self.cost_model
+        search.check_cost_model(cost_model)
+        with self._write_lock:
+            snapshot = self.snapshot
+            clusters = ClusterHierarchy(snapshot, cost_model, vertices_per_cluster)
+            snapshot._clusters[cost_model] = clusters
+        return clusters
+
+    def _all_pairs_table(self, snapshot, cost_model):
+        """Returns the all-pairs table for a cost model if it is still valid."""
+        if snapshot.costs_modified(cost_model):
+            return None
+        return snapshot._all_pairs.get(cost_model)
+
+    def get_distance(self, start, destination, cost_model=None):
+        """Returns the cost of the cheapest route (inf if unreachable)."""
+        cost_model = cost_model or self.cost_model
+        snapshot = self.snapshot
+        table = self._all_pairs_table(snapshot, cost_model)
+        if table is None or self.turn_penalties or start not in snapshot.vertices:
+            return self.find_path(start, destination, cost_model)[1]
+        if destination not in snapshot.vertices:
+            return search.INF
+        return table.distance(start, destination)
+
+    def cost_matrix(self, sources, targets, cost_model=None):
+        """Returns matrix[i][j], the cost from sources[i] to targets[j].
+
+        Runs one search per distinct source that stops once every target is
+        settled, or one reverse search per distinct target when there are
+        fewer targets than sources. Unknown or unreachable pairs cost inf.
+        """
+        cost_model = cost_model or self.cost_model
+        search.check_cost_model(cost_model)
+        snapshot = self.snapshot
+        matrix = [[search.INF] * len(targets) for _ in sources]
+        known_sources = {v for v in sources if v in snapshot.vertices}
+        known_targets = {v for v in targets if v in snapshot.vertices}
+        if not known_sources or not known_targets:
+            return matrix
+
+        table = self._all_pairs_table(snapshot, cost_model)
+        if table is not None:
+            distance = table.distance
+        else:
+            costs = snapshot.get_lane_costs(cost_model)
+            reverse = len(known_targets) < len(known_sources)
+            if reverse:
+                roots, others = known_targets, known_sources
+            else:
+                roots, others = known_sources, known_targets
+            trees = {
+                root: search.shortest_path_tree(
+                    snapshot, root, costs, reverse=reverse, targets=others
+                )[0]
+                for root in roots
+            }
+            if reverse:
+                distance = lambda start, end: trees[end][start]
+            else:
+                distance = lambda start, end: trees[start][end]
+
+        for i, start in enumerate(sources):
+            if start in known_sources:
+                row = matrix[i]
+                for j, end in enumerate(targets):
+                    if end in known_targets:
+                        row[j] = distance(start, end)
+        return matrix
+
+    def path_cache_info(self):
+        """Returns hit/miss statistics of the path cache."""
+        return {
+            "hits": self.path_cache_hits,
+            "misses": self.path_cache_misses,
+            "size": len(self._path_cache),
+            "maxsize": self.path_cache_size,
+            "version": self.version,
+        }
+
+    def clear_path_cache(self):
+        """Drop all cached paths and reset the statistics."""
+        with self._path_cache_lock:
+            self._path_cache.clear()
+            self._route_cache.clear()
+            self.path_cache_hits = 0
+            self.path_cache_misses = 0
+
+    def build_landmarks(self, count=8, cost_model=None):
+        """Precompute ALT landmarks; A* searches then use them automatically.
 
-    def get_shortest_path(self, start, destination):
-        """Finds the shortest path using Dijkstra's algorithm."""
-        priority_queue = [(0, start, [])]  # (cost, current_node, path)
-        visited = set()
+        Costs k forward and k backward Dijkstra runs, i.e. linear in the
+        graph size per landmark.
+        """
+        cost_model = cost_model or self.cost_model
+        search.check_cost_model(cost_model)
+        snapshot = self.snapshot
+        landmarks = LandmarkTable.build(snapshot, cost_model, count)
+        snapshot._landmarks[cost_model] = landmarks
+        return landmarks
+
+    def _heuristics(self, snapshot, start, destination, cost_model):
+        """Lower bounds (to_goal, from_start) on the cost v -> destination and
+        start -> v: Euclidean, tightened by ALT landmarks when available."""
+        scale = snapshot.get_heuristic_scale(cost_model)
+        to_goal = search.euclidean_heuristic(snapshot, destination, scale)
+        from_start = search.euclidean_heuristic(snapshot, start, scale)
+        landmarks = snapshot._landmarks.get(cost_model)
+        if landmarks is not None and not snapshot.faster_lane_count:
+            to_goal = landmarks.heuristic_to(destination, to_goal)
+            from_start = landmarks.heuristic_from(start, from_start)
+        return to_goal, from_start
+
+    def find_path(self, start, destination, cost_model=None, algorithm=None):
+        """Returns (path, cost) of the cheapest route, or (None, inf).
+
+        The whole query runs on the snapshot current when it starts.
+        Results are served from the LRU path cache while the graph version
+        is unchanged; the returned path is always a fresh list. With turn
+        penalties the cost includes them (see set_turn_penalties).
+        """
+        cost_model = cost_model or self.cost_model
+        algorithm = algorithm or self.algorithm
+        search.check_cost_model(cost_model)
+        search.check_algorithm(algorithm)
+        snapshot = self.snapshot
+        if start not in snapshot.vertices or destination not in snapshot.vertices:
+            return None, search.INF
+        if snapshot.unreachable(start, destination):
+            return None, search.INF
+
+        penalties = self.turn_penalties
+        table = self._all_pairs_table(snapshot, cost_model)
+        if table is not None and penalties is None:
+            return table.path(start, destination), table.distance(start, destination)
+
+        key = (start, destination, cost_model, penalties)
+        version = snapshot.generation
+        with self._path_cache_lock:
+            # Queries still on an older snapshot neither read nor clear it
+            if self._path_cache_version < version:
+                self._path_cache.clear()
+                self._path_cache_version = version
+            cached = None
+            if self._path_cache_version == version:
+                cached = self._path_cache.get(key)
+            if cached is not None:
+                self._path_cache.move_to_end(key)
+                self.path_cache_hits += 1
+            else:
+                self.path_cache_misses += 1
+
+        if cached is not None:
+            path, cost = cached
+            return (list(path) if path is not None else None), cost
 
-        while priority_queue:
-            cost, current, path = heapq.heappop(priority_queue)
+        path, cost = self._search(
+            snapshot, start, destination, cost_model, algorithm, penalties
+        )
 
-            if current in visited:
-                continue
-            visited.add(current)
+        if self.path_cache_size > 0:
+            with self._path_cache_lock:
+                if self._path_cache_version == version:
+                    self._path_cache[key] = (
+                        tuple(path) if path is not None else None,
+                        cost,
+                    )
+                    if len(self._path_cache) > self.path_cache_size:
+                        self._path_cache.popitem(last=False)
 
-            path = path + [current]
+        return path, cost
+
+    def _search(
+        self, snapshot, start, destination, cost_model, algorithm, penalties=None
+    ):
+        """Runs one uncached search with the given cost model and algorithm."""
+        costs = snapshot.get_lane_costs(cost_model)
+
+        if penalties is not None:
+            # Turns need the edge-based search; A* variants keep their bounds
+            heuristic = None
+            if algorithm in ("astar", "bidirectional_astar", "hpa"):
+                heuristic, _ = self._heuristics(
+                    snapshot, start, destination, cost_model
+                )
+            return turns.turn_aware_search(
+                snapshot, start, destination, costs, penalties, heuristic
+            )
+
+        if algorithm == "astar":
+            heuristic, _ = self._heuristics(snapshot, start, destination, cost_model)
+            return search.astar(snapshot, start, destination, costs, heuristic)
+        if algorithm == "ch":
+            if snapshot.costs_modified(cost_model):
+                # The hierarchy only knows the lane costs of the source file
+                return search.bidirectional(snapshot, start, destination, costs)
+            hierarchy = snapshot._hierarchies.get(cost_model)
+            if hierarchy is None:
+                hierarchy = self._contraction_hierarchy(snapshot, cost_model)
+            return hierarchy.query(start, destination)
+        if algorithm == "hpa":
+            clusters = self._repaired(
+                snapshot,
+                snapshot._clusters,
+                cost_model,
+                lambda latest: ClusterHierarchy(latest, cost_model),
+            )
+            heuristic, _ = self._heuristics(snapshot, start, destination, cost_model)
+            return clusters.query(start, destination, heuristic)
+        if algorithm == "bidirectional":
+            return search.bidirectional(snapshot, start, destination, costs)
+        if algorithm == "bidirectional_astar":
+            potential = search.average_potential(
+                *self._heuristics(snapshot, start, destination, cost_model)
+            )
+            return search.bidirectional(snapshot, start, destination, costs, potential)
+        return search.dijkstra(snapshot, start, destination, costs)
+
+    def set_turn_penalties(self, penalties):
+        """Charge turns between consecutive lanes in find_path (None stops).
+
+        penalties is a TurnPenalties; headings come from the lane geometry.
+        Every algorithm then runs an edge-based search, guided by the usual
+        lower bounds for the A* variants. The all-pairs tables, cost_matrix,
+        k_shortest_paths and the incremental planners ignore turns.
+        """
+        self.turn_penalties = penalties
 
-            if current == destination:
-                return path  # Return the shortest path
+    def find_path_at(self, start, destination, departure, algorithm="astar"):
+        """Returns (path, travel time) of the quickest route when leaving at
+        departure (time of day), or (None, inf).
+
+        Lane costs follow the "time" cost model scaled by the congestion
+        profiles of the lanes (see load_profiles); algorithm is "dijkstra"
+        or "astar". Results are not cached.
+        """
+        if algorithm not in time_dependent.ALGORITHMS:
+            raise ValueError(
+                f"Unknown time-dependent algorithm '{algorithm}'. "
+                f"Available algorithms: {list(time_dependent.ALGORITHMS)}"
+            )
+        snapshot = self.snapshot
+        if start not in snapshot.vertices or destination not in snapshot.vertices:
+            return None, search.INF
+        if snapshot.unreachable(start, destination):
+            return None, search.INF
+
+        travel_time = time_dependent.travel_time_function(
+            snapshot.get_lane_costs("time"), snapshot.lane_profiles
+        )
+        heuristic = None
+        if algorithm == "astar":
+            # Static bounds still hold once scaled by the smallest factor
+            bound, _ = self._heuristics(snapshot, start, destination, "time")
+            floor = snapshot.min_profile_factor
+            heuristic = bound if floor == 1.0 else lambda v: floor * bound(v)
+        path, arrival = time_dependent.earliest_arrival(
+            snapshot, start, destination, departure, travel_time, heuristic
+        )
+        return path, arrival - departure
+
+    def find_path_incremental(self, start, destination, cost_model=None):
+        """Returns (path, cost) like find_path, from a planner kept per
+        destination that is repaired instead of rerun when lanes change.
+
+        Suited to repeated queries towards the same destination, e.g. every
+        robot heading there replanning after a closure or speed change.
+        """
+        cost_model = cost_model or self.cost_model
+        search.check_cost_model(cost_model)
+        snapshot = self.snapshot
+        if start not in snapshot.vertices or destination not in snapshot.vertices:
+            return None, search.INF
+        if snapshot.unreachable(start, destination):
+            return None, search.INF
+
+        planner = self._repaired(
+            snapshot,
+            snapshot._planners,
+            (destination, cost_model),
+            lambda latest: IncrementalPlanner(latest, destination, cost_model),
+        )
+        return planner.find_path(start)
+
+    def release_planners(self, keep=()):
+        """Drop the incremental planners of destinations not in keep."""
+        keep = set(keep)
+        planners = self.snapshot._planners
+        for key in [key for key in list(planners) if key[0] not in keep]:
+            planners.pop(key, None)
+
+    def k_shortest_paths(self, start, destination, k, cost_model=None):
+        """Returns up to k cheapest loopless routes as [(path, cost), ...].
+
+        Routes are cached per start/destination pair until the graph
+        changes; asking for fewer routes than cached is a lookup.
+        """
+        cost_model = cost_model or self.cost_model
+        search.check_cost_model(cost_model)
+        snapshot = self.snapshot
+        if start not in snapshot.vertices or destination not in snapshot.vertices:
+            return []
+
+        key = (start, destination, cost_model)
+        version = snapshot.generation
+        with self._path_cache_lock:
+            if self._route_cache_version < version:
+                self._route_cache.clear()
+                self._route_cache_version = version
+            cached = None
+            if self._route_cache_version == version:
+                cached = self._route_cache.get(key)
+            if cached is not None:
+                self._route_cache.move_to_end(key)
+
+        # cached is (routes, exhausted): fewer routes than asked means no more
+        if cached is None or (len(cached[0]) < k and not cached[1]):
+            costs = snapshot.get_lane_costs(cost_model)
+            routes = tuple(
+                (tuple(path), cost)
+                for path, cost in k_shortest_paths(
+                    snapshot, start, destination, costs, k
+                )
+            )
+            cached = (routes, len(routes) < k)
+            if self.path_cache_size > 0:
+                with self._path_cache_lock:
+                    if self._route_cache_version == version:
+                        self._route_cache[key] = cached
+                        if len(self._route_cache) > self.path_cache_size:
+                            self._route_cache.popitem(last=False)
 
-            for neighbor, speed in self.edges.get(current, []):
-                if neighbor not in visited:
-                    heapq.heappush(priority_queue, (cost + 1, neighbor, path))
+        return [(list(path), cost) for path, cost in cached[0][:k]]
 
-        return None  # No path found
+    def get_shortest_path(self, start, destination, cost_model=None, algorithm=None):
+        """Finds the shortest path with the selected search algorithm."""
+        path, _ = self.find_path(start, destination, cost_model, algorithm)
+        return path
 
 
 # Example usage
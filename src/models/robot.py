@@ -1,14 +1,17 @@
 import logging
+from collections import deque
 from datetime import datetime
 
 
 class Robot:
-    def __init__(self, robot_id, start_vertex):
+    def __init__(self, robot_id, start_vertex, level=None):
         self.robot_id = robot_id
+        self.level = level  # Site level the robot is on
         self.current_position = start_vertex
         self.destination = None
         self.status = "Idle"
         self.path = []
+        self.legs = deque()  # (level, path) still to run after self.path
         self.setup_logger()
 
     def setup_logger(self):
@@ -18,17 +21,38 @@ class Robot:
         handler.setFormatter(logging.Formatter("%(asctime)s - %(message)s"))
         self.logger.addHandler(handler)
 
-    def assign_task(self, destination, path):
-        """Assign task with logging"""
+    def assign_task(self, destination, path, legs=()):
+        """Assign task with logging
+
+        legs lists further (level, path) pairs for routes that change level;
+        each one starts with a transfer through a connector.
+        """
         self.destination = destination
         self.path = path
+        self.legs = deque(legs)
         self.status = "Moving"
         self.logger.info(
             f"Task assigned: {self.current_position} -> {destination} via {path}"
         )
 
+    def reroute(self, path):
+        """Replace the rest of the current leg with a new path"""
+        self.path = path
+        self.logger.info(f"Rerouted from {self.current_position} via {path}")
+
+    def reroute_leg(self, index, path):
+        """Replace the path of a queued leg (see assign_task)"""
+        level = self.legs[index][0]
+        self.legs[index] = (level, path)
+        self.logger.info(f"Rerouted leg on level {level} via {path}")
+
     def move(self):
         """Move robot with position logging"""
+        if not self.path and self.legs:
+            self.level, self.path = self.legs.popleft()
+            self.path = list(self.path)
+            self.logger.info(f"Transferring to level {self.level}")
+
         if not self.path:
             self.status = "Task Complete"
             self.logger.info(f"Task completed at {self.current_position}")
@@ -38,7 +62,7 @@ class Robot:
         self.current_position = self.path.pop(0)
         self.logger.info(f"Moved {prev_position} -> {self.current_position}")
 
-        if not self.path:
+        if not self.path and not self.legs:
             self.status = "Task Complete"
             self.logger.info(f"Task completed at {self.current_position}")
             return False
@@ -55,6 +79,7 @@ class Robot:
         """Return current status snapshot for GUI"""
         return {
             "id": self.robot_id,
+            "level": self.level,
             "position": self.current_position,
             "status": self.status,
             "destination": self.destination,
@@ -0,0 +1,370 @@
+import hashlib
+import heapq
+import json
+import os
+from collections import OrderedDict, defaultdict
+from contextlib import ExitStack
+from threading import Lock
+
+from src.models.nav_graph import NavGraph
+from src.utils import search
+
+
+class Site:
+    """All levels of one nav graph file, parsed once and loaded lazily.
+
+    A level becomes a NavGraph the first time it is requested (memory-mapping
+    its compiled form when available) and stays cached afterwards. With a
+    memory_budget (bytes), the least recently used levels are evicted once
+    the loaded levels use more than the budget; evicted levels are loaded
+    again on their next access, with the lane closures, speed overrides,
+    congestion profiles and turn penalties they had when evicted.
+
+    Levels are linked by connectors (lifts, ramps) declared in an optional
+    top-level "connectors" list of the file::
+
+        {"name": "lift_a", "vertices": {"l0": 3, "l1": 0}, "transfer_cost": 5}
+
+    Moving between any two levels of a connector costs transfer_cost, in
+    the units of the cost model used for planning.
+    """
+
+    def __init__(self, json_path, memory_budget=None, **graph_options):
+        """graph_options are passed on to every NavGraph (cost_model, ...)"""
+        self.json_path = json_path
+        self.memory_budget = memory_budget
+        self.graph_options = graph_options
+
+        with open(json_path, "rb") as file:
+            raw = file.read()
+        self.source_hash = hashlib.sha256(raw).hexdigest()
+        self._data = json.loads(raw)
+        self.level_names = list(self._data["levels"])
+
+        self._levels = OrderedDict()  # level name -> NavGraph, LRU first
+        self._compiled = set()  # Levels that can be reloaded without the JSON
+        # level name -> runtime state of an evicted level (see _unload)
+        self._evicted = {}
+        self._lock = Lock()
+
+        # name -> {"vertices": {level: vertex}, "transfer_cost": cost}
+        self.connectors = {}
+        self._connectors_at = defaultdict(list)  # (level, vertex) -> [names]
+        # (level, cost_model) -> (graph id, version, {vertex: [(vertex, cost)]})
+        self._overlay = {}
+        for connector in self._data.get("connectors", []):
+            self.add_connector(
+                connector["name"],
+                connector["vertices"],
+                connector.get("transfer_cost", 1.0),
+            )
+
+    def level(self, level_name):
+        """Returns the NavGraph of a level, loading it on first access."""
+        with self._lock:
+            graph = self._levels.get(level_name)
+            if graph is not None:
+                self._levels.move_to_end(level_name)
+                return graph
+
+            if level_name not in self.level_names:
+                raise ValueError(
+                    f"Level '{level_name}' not found. "
+                    f"Available levels: {self.level_names}"
+                )
+
+            graph = NavGraph(
+                self.json_path,
+                level_name,
+                source_hash=self.source_hash,
+                source_data=self._data,
+                **self.graph_options,
+            )
+            state = self._evicted.pop(level_name, None)
+            if state is not None:
+                graph.restore_lane_state(state["lanes"])
+                graph.set_turn_penalties(state["turn_penalties"])
+            self._levels[level_name] = graph
+            self._note_compiled(graph)
+            self._enforce_budget()
+            return graph
+
+    __getitem__ = level
+
+    def _note_compiled(self, graph):
+        """Drop the parsed JSON once every level has a compiled copy."""
+        if graph.use_compiled and os.path.exists(graph.compiled_path()):
+            self._compiled.add(graph.level_name)
+        if self._data is not None and self._compiled.issuperset(self.level_names):
+            self._data = None
+
+    def _enforce_budget(self):
+        """Evict least recently used levels while over the memory budget."""
+        if self.memory_budget is None:
+            return
+        while len(self._levels) > 1 and self.memory_usage() > self.memory_budget:
+            self._unload(next(iter(self._levels)))
+
+    def _unload(self, level_name):
+        """Drop a loaded level, keeping the runtime state it cannot get back
+        from the source file."""
+        graph = self._levels.pop(level_name, None)
+        if graph is None:
+            return
+        with graph._write_lock:  # Let a change in progress land first
+            self._evicted[level_name] = {
+                "lanes": graph.snapshot.lane_state(),
+                "turn_penalties": graph.turn_penalties,
+            }
+
+    def reload(self, keep=()):
+        """Re-read the source file after an edit.
+
+        Loaded levels are updated in place (see NavGraph.reload), levels
+        no longer in the file are unloaded and the connectors are read from
+        the file again. The edit is applied to all levels or, if any level
+        of it fails to load or it removes one of the levels named in keep
+        (ValueError), to none of them. Returns
+        {level name: changed lanes} for the loaded levels that changed;
+        removed levels map to None.
+        """
+        with open(self.json_path, "rb") as file:
+            raw = file.read()
+        source_hash = hashlib.sha256(raw).hexdigest()
+        if source_hash == self.source_hash:
+            return {}
+        data = json.loads(raw)
+        try:
+            level_names = list(data["levels"])
+            connectors = [
+                (
+                    connector["name"],
+                    connector["vertices"],
+                    connector.get("transfer_cost", 1.0),
+                )
+                for connector in data.get("connectors", [])
+            ]
+        except (KeyError, TypeError, AttributeError) as error:
+            raise ValueError(
+                f"{self.json_path} is not a valid nav graph file: {error!r}"
+            ) from error
+        for name, vertices, _ in connectors:
+            self._check_connector(name, vertices, level_names)
+        removed = sorted(set(keep).difference(level_names))
+        if removed:
+            raise ValueError(f"The edit removes levels still in use: {removed}")
+
+        with self._lock, ExitStack() as stack:
+            graphs = [
+                (level_name, graph)
+                for level_name, graph in self._levels.items()
+                if level_name in level_names
+            ]
+            # Writers of every level wait until the whole edit is published
+            for _, graph in graphs:
+                stack.enter_context(graph._write_lock)
+            prepared = [
+                (level_name, graph, graph._prepare_reload(source_hash, data))
+                for level_name, graph in graphs
+                if graph.snapshot.source_hash != source_hash
+            ]
+
+            self.source_hash = source_hash
+            self._data = data
+            self.level_names = level_names
+            self._compiled = set()
+            changes = {}
+            for level_name in list(self._levels):
+                if level_name not in level_names:
+                    del self._levels[level_name]
+                    changes[level_name] = None
+            for level_name in list(self._evicted):
+                if level_name not in level_names:
+                    del self._evicted[level_name]
+            for level_name, graph, (snapshot, changed, parsed) in prepared:
+                graph._commit_reload(snapshot, changed, parsed)
+                if changed:
+                    changes[level_name] = changed
+            for _, graph in graphs:
+                self._note_compiled(graph)
+
+            self.connectors = {}
+            self._connectors_at = defaultdict(list)
+            for connector in connectors:
+                self.add_connector(*connector)
+            self._enforce_budget()
+        return changes
+
+    def evict(self, level_name):
+        """Unload a level; it is reloaded on its next access."""
+        with self._lock:
+            self._unload(level_name)
+
+    def loaded_levels(self):
+        """Names of the levels currently held in memory, least recent first."""
+        return list(self._levels)
+
+    def memory_usage(self):
+        """Approximate bytes used by all loaded levels."""
+        return sum(graph.memory_usage() for graph in self._levels.values())
+
+    def add_connector(self, name, vertices, transfer_cost=1.0):
+        """Declare a lift/ramp linking {level_name: vertex} across levels."""
+        self._check_connector(name, vertices, self.level_names)
+        if name in self.connectors:
+            for key in self.connectors[name]["vertices"].items():
+                self._connectors_at[key].remove(name)
+
+        self.connectors[name] = {
+            "vertices": dict(vertices),
+            "transfer_cost": transfer_cost,
+        }
+        for key in vertices.items():
+            self._connectors_at[key].append(name)
+        self._overlay = {}
+
+    @staticmethod
+    def _check_connector(name, vertices, level_names):
+        for level_name in vertices:
+            if level_name not in level_names:
+                raise ValueError(
+                    f"Connector '{name}' references unknown level '{level_name}'"
+                )
+
+    def _connector_vertices(self, level_name):
+        """Vertices of a level that belong to at least one connector."""
+        return {
+            connector["vertices"][level_name]
+            for connector in self.connectors.values()
+            if level_name in connector["vertices"]
+        }
+
+    def _costs_to(self, graph, vertex, vertices, cost_model, reverse=False):
+        """{v: cost} from vertex to each reachable v (or from v, if reverse)."""
+        if not vertices:
+            return {}
+        dist, _, _ = search.shortest_path_tree(
+            graph,
+            vertex,
+            graph.get_lane_costs(cost_model),
+            reverse=reverse,
+            targets=vertices,
+        )
+        return {v: dist[v] for v in vertices if dist[v] < search.INF}
+
+    def _overlay_edges(self, level_name, cost_model):
+        """Connector-to-connector costs within one level (cached per version)."""
+        graph = self.level(level_name)
+        snapshot = graph.snapshot
+        cached = self._overlay.get((level_name, cost_model))
+        if cached is not None and cached[:2] == (id(graph), snapshot.generation):
+            return cached[2]
+
+        connectors = self._connector_vertices(level_name)
+        edges = {}
+        for vertex in connectors:
+            others = connectors - {vertex}
+            edges[vertex] = list(
+                self._costs_to(snapshot, vertex, others, cost_model).items()
+            )
+        self._overlay[(level_name, cost_model)] = (
+            id(graph),
+            snapshot.generation,
+            edges,
+        )
+        return edges
+
+    def plan_route(self, start_level, start, goal_level, goal, cost_model=None):
+        """Plan a route that may change levels through connectors.
+
+        The search runs on the small overlay of connector vertices (with
+        precomputed intra-level costs) and only then expands the chosen
+        segments on each level. Returns ``(legs, cost)`` where legs is a list
+        of ``(level_name, path)``; consecutive legs are joined by a connector
+        transfer. Returns ``(None, inf)`` if the goal cannot be reached.
+        Routes within one level never leave it.
+        """
+        start_graph = self.level(start_level)
+        goal_graph = self.level(goal_level)
+        cost_model = cost_model or start_graph.cost_model
+        search.check_cost_model(cost_model)
+        if start not in start_graph.vertices or goal not in goal_graph.vertices:
+            return None, search.INF
+
+        if start_level == goal_level:
+            path, cost = start_graph.find_path(start, goal, cost_model)
+            return ([(start_level, path)] if path else None), cost
+
+        entries = self._costs_to(
+            start_graph.snapshot,
+            start,
+            self._connector_vertices(start_level),
+            cost_model,
+        )
+        exits = self._costs_to(
+            goal_graph.snapshot,
+            goal,
+            self._connector_vertices(goal_level),
+            cost_model,
+            reverse=True,
+        )
+
+        # Dijkstra over (level, vertex) connector nodes
+        dist = {(start_level, v): cost for v, cost in entries.items()}
+        heap = [(cost, node) for node, cost in dist.items()]
+        heapq.heapify(heap)
+        pred = {}
+        best, best_node = search.INF, None
+
+        while heap:
+            cost, node = heapq.heappop(heap)
+            if cost > dist[node]:
+                continue
+            if cost >= best:
+                break
+            level_name, vertex = node
+            if level_name == goal_level and vertex in exits:
+                if cost + exits[vertex] < best:
+                    best, best_node = cost + exits[vertex], node
+
+            neighbors = [
+                ((level_name, other), edge_cost)
+                for other, edge_cost in self._overlay_edges(
+                    level_name, cost_model
+                ).get(vertex, ())
+            ]
+            for name in self._connectors_at[node]:
+                connector = self.connectors[name]
+                for other_level, other in connector["vertices"].items():
+                    if other_level != level_name:
+                        neighbors.append(
+                            ((other_level, other), connector["transfer_cost"])
+                        )
+
+            for neighbor, edge_cost in neighbors:
+                if cost + edge_cost < dist.get(neighbor, search.INF):
+                    dist[neighbor] = cost + edge_cost
+                    pred[neighbor] = node
+                    heapq.heappush(heap, (cost + edge_cost, neighbor))
+
+        if best_node is None:
+            return None, search.INF
+
+        nodes = [best_node]
+        while nodes[-1] in pred:
+            nodes.append(pred[nodes[-1]])
+        nodes.reverse()
+        nodes.append((goal_level, goal))
+
+        # Expand the overlay route into per-level paths
+        legs = [(start_level, [start])]
+        for level_name, vertex in nodes:
+            leg_level, leg_path = legs[-1]
+            if level_name != leg_level:
+                legs.append((level_name, [vertex]))  # Connector transfer
+            elif vertex != leg_path[-1]:
+                segment, _ = self.level(level_name).find_path(
+                    leg_path[-1], vertex, cost_model
+                )
+                leg_path.extend(segment[1:])
+        return legs, best
@@ -0,0 +1,182 @@
+import heapq
+import math
+from collections import defaultdict
+
+
+class GridIndex:
+    """Uniform grid over vertex coordinates for nearest and radius queries.
+
+    Each vertex is filed under the square cell containing it; queries visit
+    rings of cells around the query point and stop as soon as no unvisited
+    cell can hold a closer vertex.
+    """
+
+    def __init__(self, xs, ys, cell_size=None):
+        self.xs = xs
+        self.ys = ys
+        count = len(xs)
+        if cell_size is None:
+            # Aim for about two vertices per cell
+            if count:
+                width = max(xs) - min(xs)
+                height = max(ys) - min(ys)
+                # A row of vertices has no area: size cells along its length
+                area = max(width * height, max(width, height) ** 2 / count, 1e-12)
+                cell_size = math.sqrt(area * 2.0 / count)
+            cell_size = max(cell_size or 1.0, 1e-6)
+        self.cell_size = cell_size
+
+        self.cells = defaultdict(list)  # (column, row) -> [vertex ids]
+        for vertex in range(count):
+            self.cells[self._cell(xs[vertex], ys[vertex])].append(vertex)
+        self.cells = dict(self.cells)
+
+        if self.cells:
+            columns = [column for column, _ in self.cells]
+            rows = [row for _, row in self.cells]
+            self.bounds = (min(columns), min(rows), max(columns), max(rows))
+
+    def updated(self, xs, ys, vertices):
+        """Returns an index over new coordinate arrays in which only the
+        given vertices (moved, added or removed) are refiled.
+
+        Cells without changes are shared with this index, which is left
+        untouched. The cell size is kept.
+        """
+        index = GridIndex.__new__(GridIndex)
+        index.xs, index.ys, index.cell_size = xs, ys, self.cell_size
+        cells = dict(self.cells)
+        copied = set()  # Cells whose lists belong to the new index
+
+        def cell_list(cell):
+            if cell not in copied:
+                cells[cell] = list(cells.get(cell, ()))
+                copied.add(cell)
+            return cells[cell]
+
+        for vertex in vertices:
+            if vertex < len(self.xs):
+                cell = self._cell(self.xs[vertex], self.ys[vertex])
+                members = cell_list(cell)
+                members.remove(vertex)
+                if not members:
+                    del cells[cell]
+                    copied.discard(cell)
+            if vertex < len(xs):
+                cell_list(self._cell(xs[vertex], ys[vertex])).append(vertex)
+        index.cells = cells
+
+        if cells:
+            # Bounds only need to contain every cell; stale ones cost a ring
+            columns = [column for column, _ in copied]
+            rows = [row for _, row in copied]
+            if hasattr(self, "bounds"):
+                columns += [self.bounds[0], self.bounds[2]]
+                rows += [self.bounds[1], self.bounds[3]]
+            index.bounds = (min(columns), min(rows), max(columns), max(rows))
+        return index
+
+    def _cell(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def _rings(self, x, y):
+        """Yields (cells, bound): the cells of each ring around (x, y) and a
+        lower bound on the distance to any cell outside the rings so far.
+
+        Rings start at the first one that reaches the bounds of the index
+        and only hold cells inside them, so queries far from the vertices
+        do not walk empty cells.
+        """
+        column, row = self._cell(x, y)
+        min_column, min_row, max_column, max_row = self.bounds
+        first_ring = max(
+            min_column - column, column - max_column, min_row - row, row - max_row, 0
+        )
+        last_ring = max(
+            column - min_column, max_column - column, row - min_row, max_row - row
+        )
+        size = self.cell_size
+        for ring in range(first_ring, last_ring + 1):
+            # Part of the ring's square inside the bounds
+            left, right = max(column - ring, min_column), min(column + ring, max_column)
+            top, bottom = max(row - ring, min_row), min(row + ring, max_row)
+            ring_cells = [
+                (c, r)
+                for r in {row - ring, row + ring}
+                if min_row <= r <= max_row
+                for c in range(left, right + 1)
+            ] + [
+                (c, r)
+                for c in {column - ring, column + ring}
+                if min_column <= c <= max_column
+                for r in range(
+                    max(top, row - ring + 1), min(bottom, row + ring - 1) + 1
+                )
+            ]
+            bound = min(
+                x - (column - ring) * size,
+                (column + ring + 1) * size - x,
+                y - (row - ring) * size,
+                (row + ring + 1) * size - y,
+            )
+            yield ring_cells, bound
+
+    def nearest(self, x, y):
+        """Vertex closest to (x, y), or None for an empty index."""
+        nearest = self.k_nearest(x, y, 1)
+        return nearest[0] if nearest else None
+
+    def k_nearest(self, x, y, k):
+        """Up to k vertices closest to (x, y), nearest first."""
+        if not self.cells or k <= 0:
+            return []
+        xs, ys = self.xs, self.ys
+        best = []  # Max-heap of (-distance, -vertex) holding the k best
+        for ring_cells, bound in self._rings(x, y):
+            for cell in ring_cells:
+                for vertex in self.cells.get(cell, ()):
+                    entry = (-math.hypot(xs[vertex] - x, ys[vertex] - y), -vertex)
+                    if len(best) < k:
+                        heapq.heappush(best, entry)
+                    elif entry > best[0]:
+                        heapq.heapreplace(best, entry)
+            if len(best) == k and -best[0][0] <= bound:
+                break
+        return [-vertex for _, vertex in sorted(best, reverse=True)]
+
+    def within_radius(self, x, y, radius):
+        """Vertices within radius of (x, y), nearest first."""
+        if not self.cells or radius < 0:
+            return []
+        xs, ys = self.xs, self.ys
+        min_column, min_row, max_column, max_row = self.bounds
+        first_column, first_row = self._cell(x - radius, y - radius)
+        last_column, last_row = self._cell(x + radius, y + radius)
+        first_column, first_row = max(first_column, min_column), max(first_row, min_row)
+        last_column, last_row = min(last_column, max_column), min(last_row, max_row)
+        if first_column > last_column or first_row > last_row:
+            return []
+
+        area = (last_column - first_column + 1) * (last_row - first_row + 1)
+        if area > len(self.cells):
+            # Covers more cells than are occupied: filter the occupied ones
+            cells = [
+                members
+                for (column, row), members in self.cells.items()
+                if first_column <= column <= last_column
+                and first_row <= row <= last_row
+            ]
+        else:
+            cells = [
+                self.cells.get((column, row), ())
+                for column in range(first_column, last_column + 1)
+                for row in range(first_row, last_row + 1)
+            ]
+        found = []
+        for members in cells:
+            for vertex in members:
+                distance = math.hypot(xs[vertex] - x, ys[vertex] - y)
+                if distance <= radius:
+                    found.append((distance, vertex))
+        found.sort()
+        return [vertex for _, vertex in found]
@@ -0,0 +1,92 @@
+from array import array
+
+from src.utils import search
+from src.utils.helpers import load_arrays, save_arrays
+
+MAGIC = b"NAVAPSP"
+FORMAT_VERSION = 2
+
+
+class AllPairsTable:
+    """All-pairs distance and next-hop matrices for one graph and cost model.
+
+    Both matrices are flat row-major arrays: ``dist[s * n + t]`` is the cost
+    from s to t and ``next_hop[s * n + t]`` the vertex after s on that path
+    (-1 when t cannot be reached).
+    """
+
+    def __init__(self, vertex_count, cost_model, source_hash, dist, next_hop):
+        self.vertex_count = vertex_count
+        self.cost_model = cost_model
+        self.source_hash = source_hash
+        self.dist = dist
+        self.next_hop = next_hop
+
+    @classmethod
+    def build(cls, graph, cost_model):
+        """Run one Dijkstra per vertex and record distances and first hops.
+
+        Uses the lane costs of the source file, ignoring closed lanes.
+        """
+        costs = search.lane_costs(graph, cost_model)
+        n = len(graph.vertices)
+        dist = array("d")
+        next_hop = array("i")
+
+        for source in range(n):
+            row_dist, pred, order = search.shortest_path_tree(graph, source, costs)
+            row_next = array("i", [-1]) * n
+            # Settled order guarantees pred[v] is resolved before v
+            for vertex in order:
+                parent = pred[vertex]
+                if parent < 0 or parent == source:
+                    row_next[vertex] = vertex
+                else:
+                    row_next[vertex] = row_next[parent]
+            dist.extend(row_dist)
+            next_hop.extend(row_next)
+
+        return cls(n, cost_model, graph.source_hash, dist, next_hop)
+
+    def distance(self, start, destination):
+        """Cost of the cheapest route from start to destination (inf if none)."""
+        return self.dist[start * self.vertex_count + destination]
+
+    def path(self, start, destination):
+        """Vertex path from start to destination, or None if unreachable."""
+        n = self.vertex_count
+        if self.next_hop[start * n + destination] < 0:
+            return None
+        path = [start]
+        while path[-1] != destination and len(path) <= n:
+            path.append(self.next_hop[path[-1] * n + destination])
+        return path if path[-1] == destination else None
+
+    def save(self, path):
+        """Write the table to disk."""
+        header = {
+            "format": FORMAT_VERSION,
+            "vertex_count": self.vertex_count,
+            "cost_model": self.cost_model,
+            "source_hash": self.source_hash,
+        }
+        save_arrays(path, MAGIC, header, [self.dist, self.next_hop])
+
+    @classmethod
+    def load(cls, path, source_hash=None):
+        """Read a table written by save(); returns None if missing or stale."""
+        loaded = load_arrays(path, MAGIC)
+        if loaded is None:
+            return None
+        header, (dist, next_hop) = loaded
+        if header.get("format") != FORMAT_VERSION or (
+            source_hash and header["source_hash"] != source_hash
+        ):
+            return None
+        return cls(
+            header["vertex_count"],
+            header["cost_model"],
+            header["source_hash"],
+            dist,
+            next_hop,
+        )
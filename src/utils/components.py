@@ -0,0 +1,93 @@
+from array import array
+
+
+def strong_components(graph, lane_open=None):
+    """Strongly connected component id of every vertex (iterative Tarjan).
+
+    Components are numbered in the order Tarjan's algorithm completes them,
+    which is a reverse topological order of the component graph: if u can
+    reach v then ``component[v] <= component[u]``. lane_open(lane_id), if
+    given, filters the lanes that count.
+    """
+    offsets, targets, lane_ids = graph.offsets, graph.targets, graph.lane_ids
+    n = len(offsets) - 1
+    component = array("i", [-1]) * n
+    index = array("i", [-1]) * n  # Discovery order
+    low = array("i", [0]) * n
+    on_stack = bytearray(n)
+    stack = []
+    next_index = 0
+    count = 0
+
+    for root in range(n):
+        if index[root] >= 0:
+            continue
+        index[root] = low[root] = next_index
+        next_index += 1
+        stack.append(root)
+        on_stack[root] = 1
+        work = [(root, offsets[root])]  # (vertex, next CSR position to scan)
+
+        while work:
+            vertex, position = work[-1]
+            end = offsets[vertex + 1]
+            while position < end:
+                neighbor = targets[position]
+                position += 1
+                if lane_open is not None and not lane_open(lane_ids[position - 1]):
+                    continue
+                if index[neighbor] < 0:
+                    break
+                if on_stack[neighbor] and index[neighbor] < low[vertex]:
+                    low[vertex] = index[neighbor]
+            else:
+                # Every lane scanned: vertex is finished
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[vertex] < low[parent]:
+                        low[parent] = low[vertex]
+                if low[vertex] == index[vertex]:
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        component[member] = count
+                        if member == vertex:
+                            break
+                    count += 1
+                continue
+
+            # Descend into the unvisited neighbor, resuming here afterwards
+            work[-1] = (vertex, position)
+            index[neighbor] = low[neighbor] = next_index
+            next_index += 1
+            stack.append(neighbor)
+            on_stack[neighbor] = 1
+            work.append((neighbor, offsets[neighbor]))
+
+    return component
+
+
+def weak_components(graph, lane_open=None):
+    """Connected component id of every vertex, ignoring lane direction."""
+    n = len(graph.offsets) - 1
+    parent = array("i", range(n))
+
+    def find(vertex):
+        while parent[vertex] != vertex:
+            parent[vertex] = parent[parent[vertex]]
+            vertex = parent[vertex]
+        return vertex
+
+    for lane_id, (start, end) in enumerate(zip(graph.lane_start, graph.lane_end)):
+        if lane_open is None or lane_open(lane_id):
+            root_start, root_end = find(start), find(end)
+            if root_start != root_end:
+                parent[root_start] = root_end
+
+    # Renumber roots as 0, 1, 2, ... in vertex order
+    component = array("i", [-1]) * n
+    labels = {}
+    for vertex in range(n):
+        component[vertex] = labels.setdefault(find(vertex), len(labels))
+    return component
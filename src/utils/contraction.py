@@ -0,0 +1,268 @@
+import heapq
+from array import array
+
+from src.utils import search
+from src.utils.helpers import load_arrays, save_arrays
+
+MAGIC = b"NAVCH"
+FORMAT_VERSION = 2
+
+INF = search.INF
+
+
+def _pack(edge_lists):
+    """Pack per-vertex [(other, cost, middle)] lists into CSR arrays."""
+    offsets = array("i", [0])
+    others, costs, middles = array("i"), array("d"), array("i")
+    for edges in edge_lists:
+        for other, cost, middle in edges:
+            others.append(other)
+            costs.append(cost)
+            middles.append(middle)
+        offsets.append(len(others))
+    return offsets, others, costs, middles
+
+
+class ContractionHierarchy:
+    """Contraction hierarchy over the lanes of a NavGraph for one cost model.
+
+    Vertices are contracted one by one in order of importance; a shortcut
+    u -> w (remembering the contracted middle vertex) is added whenever the
+    only cheapest u -> w route ran through the vertex being removed. Queries
+    then only follow edges towards more important vertices from both ends.
+    """
+
+    def __init__(self, cost_model, source_hash, rank, upward, downward):
+        self.cost_model = cost_model
+        self.source_hash = source_hash
+        self.rank = rank
+        self.vertex_count = len(rank)
+        # Edges to higher-ranked vertices: v -> w (upward), u -> v (downward)
+        self.up_offsets, self.up_targets, self.up_costs, self.up_middle = upward
+        (
+            self.down_offsets,
+            self.down_sources,
+            self.down_costs,
+            self.down_middle,
+        ) = downward
+
+        # (tail, head) -> middle vertex, for every shortcut
+        self._middle = {}
+        for v in range(self.vertex_count):
+            for i in range(self.up_offsets[v], self.up_offsets[v + 1]):
+                if self.up_middle[i] >= 0:
+                    self._middle[(v, self.up_targets[i])] = self.up_middle[i]
+            for i in range(self.down_offsets[v], self.down_offsets[v + 1]):
+                if self.down_middle[i] >= 0:
+                    self._middle[(self.down_sources[i], v)] = self.down_middle[i]
+
+    @classmethod
+    def build(cls, graph, cost_model, witness_limit=500):
+        """Contract every vertex of graph using the lane costs of its source file.
+
+        witness_limit caps the vertices settled by each witness search; a
+        lower limit speeds up preprocessing at the price of extra shortcuts.
+        """
+        costs = search.lane_costs(graph, cost_model)
+        n = len(graph.vertices)
+
+        # Remaining graph: v -> {neighbor: (cost, middle)}, cheapest lane kept
+        out_edges = [{} for _ in range(n)]
+        in_edges = [{} for _ in range(n)]
+        for lane_id, (start, end) in enumerate(zip(graph.lane_start, graph.lane_end)):
+            cost = costs[lane_id]
+            if start != end and cost < out_edges[start].get(end, (INF,))[0]:
+                out_edges[start][end] = (cost, -1)
+                in_edges[end][start] = (cost, -1)
+
+        def witness_search(source, excluded, max_cost):
+            """Bounded Dijkstra from source in the remaining graph without excluded."""
+            dist = {source: 0.0}
+            heap = [(0.0, source)]
+            settled = 0
+            while heap:
+                cost, current = heapq.heappop(heap)
+                if cost > dist[current]:
+                    continue
+                settled += 1
+                if cost > max_cost or settled > witness_limit:
+                    break
+                for neighbor, (lane_cost, _) in out_edges[current].items():
+                    new_cost = cost + lane_cost
+                    if neighbor != excluded and new_cost < dist.get(neighbor, INF):
+                        dist[neighbor] = new_cost
+                        heapq.heappush(heap, (new_cost, neighbor))
+            return dist
+
+        def needed_shortcuts(v):
+            """Shortcuts (u, w, cost) required if v were contracted now."""
+            shortcuts = []
+            outgoing = out_edges[v]
+            if not outgoing:
+                return shortcuts
+            max_out = max(cost for cost, _ in outgoing.values())
+            for u, (cost_in, _) in in_edges[v].items():
+                dist = witness_search(u, v, cost_in + max_out)
+                for w, (cost_out, _) in outgoing.items():
+                    if w != u and dist.get(w, INF) > cost_in + cost_out:
+                        shortcuts.append((u, w, cost_in + cost_out))
+            return shortcuts
+
+        deleted_neighbors = [0] * n
+
+        def priority(v, shortcuts):
+            """Edge difference plus already contracted neighbors."""
+            removed = len(in_edges[v]) + len(out_edges[v])
+            return len(shortcuts) - removed + deleted_neighbors[v]
+
+        queue = [(priority(v, needed_shortcuts(v)), v) for v in range(n)]
+        heapq.heapify(queue)
+        rank = array("i", [0]) * n
+        upward = [None] * n
+        downward = [None] * n
+        next_rank = 0
+
+        while queue:
+            _, v = heapq.heappop(queue)
+            # Lazy update: re-queue v if its priority got worse than the next
+            shortcuts = needed_shortcuts(v)
+            current = priority(v, shortcuts)
+            if queue and current > queue[0][0]:
+                heapq.heappush(queue, (current, v))
+                continue
+
+            for u, w, cost in shortcuts:
+                if cost < out_edges[u].get(w, (INF,))[0]:
+                    out_edges[u][w] = (cost, v)
+                    in_edges[w][u] = (cost, v)
+
+            rank[v] = next_rank
+            next_rank += 1
+            upward[v] = [(w, c, m) for w, (c, m) in out_edges[v].items()]
+            downward[v] = [(u, c, m) for u, (c, m) in in_edges[v].items()]
+
+            for w in out_edges[v]:
+                del in_edges[w][v]
+                deleted_neighbors[w] += 1
+            for u in in_edges[v]:
+                del out_edges[u][v]
+                deleted_neighbors[u] += 1
+            out_edges[v] = {}
+            in_edges[v] = {}
+
+        return cls(
+            cost_model, graph.source_hash, rank, _pack(upward), _pack(downward)
+        )
+
+    def query(self, start, goal):
+        """Bidirectional upward search; returns (path, cost) or (None, inf)."""
+        if start == goal:
+            return [start], 0.0
+
+        dist_forward, dist_backward = {start: 0.0}, {goal: 0.0}
+        pred, succ = {}, {}
+        heap_forward, heap_backward = [(0.0, start)], [(0.0, goal)]
+        best, meeting = INF, -1
+
+        while heap_forward or heap_backward:
+            top_forward = heap_forward[0][0] if heap_forward else INF
+            top_backward = heap_backward[0][0] if heap_backward else INF
+            if min(top_forward, top_backward) >= best:
+                break
+
+            if top_forward <= top_backward:
+                cost, current = heapq.heappop(heap_forward)
+                if cost > dist_forward[current]:
+                    continue
+                total = cost + dist_backward.get(current, INF)
+                if total < best:
+                    best, meeting = total, current
+                for i in range(self.up_offsets[current], self.up_offsets[current + 1]):
+                    neighbor = self.up_targets[i]
+                    new_cost = cost + self.up_costs[i]
+                    if new_cost < dist_forward.get(neighbor, INF):
+                        dist_forward[neighbor] = new_cost
+                        pred[neighbor] = current
+                        heapq.heappush(heap_forward, (new_cost, neighbor))
+            else:
+                cost, current = heapq.heappop(heap_backward)
+                if cost > dist_backward[current]:
+                    continue
+                total = cost + dist_forward.get(current, INF)
+                if total < best:
+                    best, meeting = total, current
+                first, last = self.down_offsets[current], self.down_offsets[current + 1]
+                for i in range(first, last):
+                    neighbor = self.down_sources[i]
+                    new_cost = cost + self.down_costs[i]
+                    if new_cost < dist_backward.get(neighbor, INF):
+                        dist_backward[neighbor] = new_cost
+                        succ[neighbor] = current
+                        heapq.heappush(heap_backward, (new_cost, neighbor))
+
+        if meeting < 0:
+            return None, INF
+
+        # Hierarchy-level route, then expand every shortcut on it
+        route = [meeting]
+        while route[-1] != start:
+            route.append(pred[route[-1]])
+        route.reverse()
+        while route[-1] != goal:
+            route.append(succ[route[-1]])
+
+        path = [start]
+        for tail, head in zip(route, route[1:]):
+            self._unpack_edge(tail, head, path)
+        return path, best
+
+    def _unpack_edge(self, tail, head, path):
+        """Append the original vertices of edge tail -> head (excluding tail)."""
+        stack = [(tail, head)]
+        while stack:
+            tail, head = stack.pop()
+            middle = self._middle.get((tail, head))
+            if middle is None:
+                path.append(head)
+            else:
+                stack.append((middle, head))
+                stack.append((tail, middle))
+
+    def save(self, path):
+        """Write the hierarchy to disk."""
+        header = {
+            "format": FORMAT_VERSION,
+            "cost_model": self.cost_model,
+            "source_hash": self.source_hash,
+        }
+        arrays = [
+            self.rank,
+            self.up_offsets,
+            self.up_targets,
+            self.up_costs,
+            self.up_middle,
+            self.down_offsets,
+            self.down_sources,
+            self.down_costs,
+            self.down_middle,
+        ]
+        save_arrays(path, MAGIC, header, arrays)
+
+    @classmethod
+    def load(cls, path, source_hash=None):
+        """Read a hierarchy written by save(); returns None if missing or stale."""
+        loaded = load_arrays(path, MAGIC)
+        if loaded is None:
+            return None
+        header, arrays = loaded
+        if header.get("format") != FORMAT_VERSION or (
+            source_hash and header["source_hash"] != source_hash
+        ):
+            return None
+        return cls(
+            header["cost_model"],
+            header["source_hash"],
+            arrays[0],
+            tuple(arrays[1:5]),
+            tuple(arrays[5:9]),
+        )
@@ -0,0 +1,53 @@
+import os
+import threading
+
+
+class FileWatcher:
+    """Calls on_change() when a file's modification time or size changes.
+
+    Polls os.stat, so it needs no platform file notification support;
+    poll() can be driven by an existing loop (e.g. a GUI timer) or start()
+    runs it on a daemon thread every interval seconds. A file that is
+    missing for a moment (editors saving by rename) is not a change.
+    """
+
+    def __init__(self, path, on_change, interval=1.0):
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self._signature = self._stat()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def poll(self):
+        """Check the file once; returns True if on_change was called."""
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+        self.on_change()
+        return True
+
+    def start(self):
+        """Poll on a background thread until stop()."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
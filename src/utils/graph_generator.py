@@ -0,0 +1,291 @@
+"""Synthetic nav graphs in the ``levels/vertices/lanes`` JSON schema.
+
+Every generator is deterministic for a given seed and returns one level
+(``{"vertices": [...], "lanes": [...]}``); write_graph saves levels to a
+file that NavGraph, Site and the GUI load like the shipped samples.
+
+Command line::
+
+    python -m src.utils.graph_generator grid --rows 300 --columns 300 -o big.json
+    python -m src.utils.graph_generator aisles --aisles 40 --length 200 -o aisles.json
+    python -m src.utils.graph_generator geometric --count 100000 -o rgg.json
+    python -m src.utils.graph_generator tiles data/nav_graph_1.json --rows 20 \\
+        --columns 20 -o tiled.json
+"""
+
+import argparse
+import json
+import math
+import random
+from array import array
+
+from src.models.spatial_index import GridIndex
+
+SPEED_LIMITS = (0.5, 1.0, 1.5, 2.0)
+
+
+class _LevelBuilder:
+    """Collects vertices and lanes, sharing identical property dicts."""
+
+    def __init__(self, rng, speed_limits, charger_rate):
+        self.rng = rng
+        self.speed_limits = speed_limits
+        self.charger_rate = charger_rate
+        self.vertices = []
+        self.lanes = []
+        self._plain = {"name": ""}
+        self._speeds = {speed: {"speed_limit": speed} for speed in speed_limits}
+
+    def vertex(self, x, y, name="", is_charger=False):
+        """Adds a vertex and returns its id; some become chargers."""
+        if is_charger or self.rng.random() < self.charger_rate:
+            name = name or f"charger_{len(self.vertices)}"
+            properties = {"name": name, "is_charger": True}
+        elif name:
+            properties = {"name": name}
+        else:
+            properties = self._plain
+        self.vertices.append([round(x, 6), round(y, 6), properties])
+        return len(self.vertices) - 1
+
+    def lane(self, start, end, both_ways=True, speed_limit=None):
+        """Adds a lane (and its reverse) with a random speed limit."""
+        if speed_limit is None:
+            speed_limit = self.rng.choice(self.speed_limits)
+        properties = self._speeds.get(speed_limit) or {"speed_limit": speed_limit}
+        self.lanes.append([start, end, properties])
+        if both_ways:
+            self.lanes.append([end, start, properties])
+
+    def level(self):
+        return {"vertices": self.vertices, "lanes": self.lanes}
+
+
+def warehouse_grid(
+    rows,
+    columns,
+    spacing=2.0,
+    seed=0,
+    speed_limits=SPEED_LIMITS,
+    charger_rate=0.01,
+    removal_rate=0.05,
+):
+    """Square grid of two-way lanes with a fraction of lanes removed
+    (shelving, pillars) so routes are not all Manhattan paths."""
+    rng = random.Random(seed)
+    builder = _LevelBuilder(rng, speed_limits, charger_rate)
+    for row in range(rows):
+        for column in range(columns):
+            builder.vertex(column * spacing, row * spacing)
+    builder.vertices[0][2] = {"name": "home", "is_charger": True}
+
+    for row in range(rows):
+        for column in range(columns):
+            vertex = row * columns + column
+            if column + 1 < columns and rng.random() >= removal_rate:
+                builder.lane(vertex, vertex + 1)
+            if row + 1 < rows and rng.random() >= removal_rate:
+                builder.lane(vertex, vertex + columns)
+    return builder.level()
+
+
+def aisle_layout(
+    aisles,
+    length,
+    cross_aisles=3,
+    spacing=1.5,
+    aisle_gap=4.0,
+    seed=0,
+    speed_limits=SPEED_LIMITS,
+    charger_rate=0.005,
+):
+    """Parallel one-way aisles (alternating direction) joined by two-way
+    cross aisles at both ends and at evenly spaced rows in between."""
+    rng = random.Random(seed)
+    builder = _LevelBuilder(rng, speed_limits, charger_rate)
+    for aisle in range(aisles):
+        for step in range(length):
+            builder.vertex(aisle * aisle_gap, step * spacing)
+    builder.vertices[0][2] = {"name": "home", "is_charger": True}
+
+    for aisle in range(aisles):
+        first = aisle * length
+        for step in range(length - 1):
+            if aisle % 2 == 0:
+                builder.lane(first + step, first + step + 1, both_ways=False)
+            else:
+                builder.lane(first + step + 1, first + step, both_ways=False)
+
+    cross_rows = {0, length - 1}
+    cross_rows.update(
+        round(i * (length - 1) / (cross_aisles + 1)) for i in range(1, cross_aisles + 1)
+    )
+    for step in sorted(cross_rows):
+        for aisle in range(aisles - 1):
+            builder.lane(aisle * length + step, (aisle + 1) * length + step)
+    return builder.level()
+
+
+def random_geometric(
+    count,
+    radius=None,
+    size=None,
+    seed=0,
+    speed_limits=SPEED_LIMITS,
+    charger_rate=0.01,
+):
+    """Uniformly scattered vertices with two-way lanes between every pair
+    closer than radius (default: about six neighbours per vertex)."""
+    rng = random.Random(seed)
+    builder = _LevelBuilder(rng, speed_limits, charger_rate)
+    size = size or 2.0 * math.sqrt(count)
+    radius = radius or size * math.sqrt(6.0 / (math.pi * max(count, 1)))
+    for _ in range(count):
+        builder.vertex(rng.uniform(0, size), rng.uniform(0, size))
+
+    xs = array("d", (vertex[0] for vertex in builder.vertices))
+    ys = array("d", (vertex[1] for vertex in builder.vertices))
+    index = GridIndex(xs, ys, radius)
+    for vertex in range(count):
+        for other in index.within_radius(xs[vertex], ys[vertex], radius):
+            if other > vertex:
+                builder.lane(vertex, other)
+    return builder.level()
+
+
+def tiled_sample(level, rows, columns, gap=2.0, seed=0):
+    """rows x columns copies of an existing level side by side, each copy
+    joined to its right and lower neighbours by a two-way lane between
+    their closest vertices. Lane properties of the sample are kept."""
+    rng = random.Random(seed)
+    points, point_properties = [], []
+    for vertex in level["vertices"]:
+        # Same vertex formats as NavGraph accepts
+        if isinstance(vertex, (list, tuple)):
+            points.append((vertex[0], vertex[1]))
+            point_properties.append(vertex[2] if len(vertex) > 2 else {})
+        else:
+            points.append((vertex["x"], vertex["y"]))
+            point_properties.append(vertex.get("properties", {}))
+    lanes = []
+    for lane in level["lanes"]:
+        # Likewise for lanes
+        if isinstance(lane, (list, tuple)):
+            lanes.append((lane[0], lane[1], lane[2] if len(lane) > 2 else {}))
+        else:
+            lanes.append((lane["start"], lane["end"], lane.get("properties", {})))
+
+    min_x = min(x for x, _ in points)
+    min_y = min(y for _, y in points)
+    width = max(x for x, _ in points) - min_x + gap
+    height = max(y for _, y in points) - min_y + gap
+
+    builder = _LevelBuilder(rng, SPEED_LIMITS, 0.0)
+    count = len(points)
+    for row in range(rows):
+        for column in range(columns):
+            tile = row * columns + column
+            for (x, y), properties in zip(points, point_properties):
+                name = properties.get("name", "")
+                builder.vertex(
+                    x - min_x + column * width,
+                    y - min_y + row * height,
+                    f"{name}_{tile}" if name else "",
+                    bool(properties.get("is_charger")),
+                )
+            offset = tile * count
+            for start, end, properties in lanes:
+                builder.lanes.append([start + offset, end + offset, properties])
+
+    def closest_pair(first_tile, second_tile):
+        first, second = first_tile * count, second_tile * count
+        return min(
+            ((first + i, second + j) for i in range(count) for j in range(count)),
+            key=lambda pair: math.dist(
+                builder.vertices[pair[0]][:2], builder.vertices[pair[1]][:2]
+            ),
+        )
+
+    # Tiles share a layout, so the joining pairs are the same for every tile
+    right = closest_pair(0, 1) if columns > 1 else None
+    down = closest_pair(0, columns) if rows > 1 else None
+    for row in range(rows):
+        for column in range(columns):
+            offset = (row * columns + column) * count
+            if right and column + 1 < columns:
+                builder.lane(right[0] + offset, right[1] + offset)
+            if down and row + 1 < rows:
+                builder.lane(down[0] + offset, down[1] + offset)
+    return builder.level()
+
+
+def write_graph(path, levels, building_name="synthetic"):
+    """Write {level name: level} to a nav graph JSON file."""
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(
+            {"building_name": building_name, "levels": levels},
+            file,
+            separators=(",", ":"),
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", required=True, help="JSON file to write")
+    parser.add_argument("--level", default="level1", help="name of the level")
+    parser.add_argument("--seed", type=int, default=0)
+    layouts = parser.add_subparsers(dest="layout", required=True)
+
+    grid = layouts.add_parser("grid", help="warehouse grid")
+    grid.add_argument("--rows", type=int, required=True)
+    grid.add_argument("--columns", type=int, required=True)
+    grid.add_argument("--spacing", type=float, default=2.0)
+    grid.add_argument("--removal-rate", type=float, default=0.05)
+
+    aisles = layouts.add_parser("aisles", help="one-way aisles and cross aisles")
+    aisles.add_argument("--aisles", type=int, required=True)
+    aisles.add_argument("--length", type=int, required=True)
+    aisles.add_argument("--cross-aisles", type=int, default=3)
+
+    geometric = layouts.add_parser("geometric", help="random geometric graph")
+    geometric.add_argument("--count", type=int, required=True)
+    geometric.add_argument("--radius", type=float)
+
+    tiles = layouts.add_parser("tiles", help="tiling of an existing level")
+    tiles.add_argument("source", help="nav graph JSON file to tile")
+    tiles.add_argument("--source-level", help="level to tile (default: first)")
+    tiles.add_argument("--rows", type=int, required=True)
+    tiles.add_argument("--columns", type=int, required=True)
+
+    args = parser.parse_args(argv)
+    if args.layout == "grid":
+        level = warehouse_grid(
+            args.rows,
+            args.columns,
+            args.spacing,
+            seed=args.seed,
+            removal_rate=args.removal_rate,
+        )
+    elif args.layout == "aisles":
+        level = aisle_layout(
+            args.aisles, args.length, args.cross_aisles, seed=args.seed
+        )
+    elif args.layout == "geometric":
+        level = random_geometric(args.count, args.radius, seed=args.seed)
+    else:
+        with open(args.source, "rb") as file:
+            source_levels = json.loads(file.read())["levels"]
+        source_level = args.source_level or next(iter(source_levels))
+        level = tiled_sample(
+            source_levels[source_level], args.rows, args.columns, seed=args.seed
+        )
+
+    write_graph(args.output, {args.level: level})
+    print(
+        f"✅ Wrote {len(level['vertices'])} vertices and {len(level['lanes'])} "
+        f"lanes to {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,130 @@
-import heapq
+import glob
+import json
+import os
+import struct
+import sys
+import tempfile
+from array import array
 
 
-def dijkstra(graph, start, destination):
-    """Find the shortest path using Dijkstra's algorithm."""
-    priority_queue = [(0, start, [])]  # (cost, current_node, path)
-    visited = set()
+def build_csr(num_vertices, sources):
+    """Group edge positions by source vertex (counting sort) for CSR storage.
+
+    Returns ``(offsets, order)``: the edges leaving vertex ``v`` are
+    ``order[offsets[v]:offsets[v + 1]]``, in the order they were given.
+    """
+    offsets = array("i", [0]) * (num_vertices + 1)
+    for source in sources:
+        offsets[source + 1] += 1
+    for v in range(num_vertices):
+        offsets[v + 1] += offsets[v]
+
+    cursor = array("i", offsets)
+    order = array("i", [0]) * len(sources)
+    for position, source in enumerate(sources):
+        order[cursor[source]] = position
+        cursor[source] += 1
+
+    return offsets, order
+
+
+def artifact_path(
+    json_path, level_name, tag, version, source_hash, extension, cache_dir=None
+):
+    """Location of a file derived from one level of a nav graph JSON file.
+
+    Files are named ``<stem>.<level>.<tag>.v<version>.<hash>.<extension>``
+    (version being the file format's) and live next to the JSON file unless
+    cache_dir is given, so processes running different format versions
+    never share a file.
+    """
+    directory = cache_dir or os.path.dirname(os.path.abspath(json_path))
+    stem = os.path.splitext(os.path.basename(json_path))[0]
+    return os.path.join(
+        directory,
+        f"{stem}.{level_name}.{tag}.v{version}.{source_hash[:16]}.{extension}",
+    )
+
 
-    while priority_queue:
-        cost, current, path = heapq.heappop(priority_queue)
+def write_atomically(path, write):
+    """Call write(file) on a temporary file, then move it over path.
 
-        if current in visited:
-            continue
-        visited.add(current)
+    Readers, including processes that memory-mapped the previous file,
+    see either the old file or the complete new one, never a partial one.
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    descriptor, temporary = tempfile.mkstemp(
+        prefix=f".{name}.", suffix=".tmp", dir=directory
+    )
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            write(file)
+        os.chmod(temporary, 0o644)  # mkstemp makes the file private
+        os.replace(temporary, path)
+    except BaseException:
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
+        raise
 
-        path = path + [current]
 
-        if current == destination:
-            return path  # Return the path if we reached the destination
+def remove_stale_artifacts(path):
+    """Delete files derived from older contents of the same JSON file (in
+    the same format version). Processes still mapping one keep using it."""
+    prefix, _, extension = path.rsplit(".", 2)
+    for stale in glob.glob(f"{glob.escape(prefix)}.*.{extension}"):
+        if stale != path:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
 
-        for neighbor, speed in graph.get_neighbors(current):
-            if neighbor not in visited:
-                heapq.heappush(priority_queue, (cost + 1, neighbor, path))
 
-    return None  # No path found
+def save_arrays(path, magic, header, arrays):
+    """Write a JSON header followed by raw array data to a binary file
+    (atomically, see write_atomically)."""
+    header = dict(
+        header,
+        byteorder=sys.byteorder,
+        arrays=[[values.typecode, len(values)] for values in arrays],
+    )
+    encoded = json.dumps(header).encode("utf-8")
+
+    def write(file):
+        file.write(magic)
+        file.write(struct.pack("<I", len(encoded)))
+        file.write(encoded)
+        for values in arrays:
+            values.tofile(file)
+
+    write_atomically(path, write)
+
+
+def load_arrays(path, magic):
+    """Read a file written by save_arrays.
+
+    Returns ``(header, arrays)``, or None if the file is missing, truncated
+    or was written on a machine with a different byte order.
+    """
+    try:
+        with open(path, "rb") as file:
+            if file.read(len(magic)) != magic:
+                return None
+            (header_size,) = struct.unpack("<I", file.read(4))
+            header = json.loads(file.read(header_size).decode("utf-8"))
+            if header["byteorder"] != sys.byteorder:
+                return None
+            arrays = []
+            for typecode, length in header["arrays"]:
+                values = array(typecode)
+                values.fromfile(file, length)
+                arrays.append(values)
+    except (OSError, EOFError, ValueError, KeyError, struct.error):
+        return None
+    return header, arrays
+
+
+def dijkstra(graph, start, destination):
+    """Find the shortest path (by hop count) using Dijkstra's algorithm."""
+    return graph.get_shortest_path(start, destination, cost_model="hops")
@@ -0,0 +1,298 @@
+import heapq
+import math
+from array import array
+from threading import Lock
+
+from src.models.spatial_index import GridIndex
+from src.utils import search
+
+INF = search.INF
+
+
+class ClusterHierarchy:
+    """Two-level (HPA*) planner over square spatial clusters of a NavGraph.
+
+    Entrances are the vertices with a lane to or from another cluster. For
+    every cluster the costs between its entrances, staying inside the
+    cluster, are precomputed when the hierarchy is built; together with the
+    lanes between clusters (one edge per pair of entrances) they form the
+    abstract graph. An entrance-to-entrance edge is left out when its
+    shortest path already passes through another entrance of the cluster,
+    as the two shorter edges cover it. A query links start and goal to the
+    entrances of their clusters, searches the abstract graph and then
+    refines each stretch of the abstract route inside one cluster with a
+    search confined to that cluster. Routes are exact: every route splits
+    into in-cluster pieces joined by crossing lanes.
+
+    Lane changes (update_lanes) rebuild the clusters they touch and publish
+    a new abstract graph; queries read the one current when they start and
+    take no lock.
+    """
+
+    def __init__(self, graph, cost_model, vertices_per_cluster=256):
+        self.cost_model = cost_model
+        costs = array("d", graph.get_lane_costs(cost_model))
+
+        n = len(graph.vertices)
+        xs, ys = graph.vertex_x, graph.vertex_y
+        cell_size = None
+        if n:
+            area = max((max(xs) - min(xs)) * (max(ys) - min(ys)), 1e-12)
+            cell_size = math.sqrt(area * vertices_per_cluster / n)
+        grid = GridIndex(xs, ys, cell_size)
+
+        self.cluster = array("i", [0]) * n  # Vertex -> cluster id
+        self.members = []  # Cluster id -> vertices
+        for vertices in grid.cells.values():
+            for vertex in vertices:
+                self.cluster[vertex] = len(self.members)
+            self.members.append(vertices)
+
+        # Entrance -> {entrance of another cluster: [ids of the lanes to it]}
+        self.crossings = {}
+        self.entrances = [[] for _ in self.members]  # Cluster id -> entrances
+        self.is_entrance = bytearray(n)
+        cluster = self.cluster
+        for vertex in range(n):
+            crossings = {}
+            for i in range(graph.offsets[vertex], graph.offsets[vertex + 1]):
+                target = graph.targets[i]
+                if cluster[target] != cluster[vertex]:
+                    crossings.setdefault(target, []).append(graph.lane_ids[i])
+            if crossings or any(
+                cluster[graph.in_sources[i]] != cluster[vertex]
+                for i in range(graph.in_offsets[vertex], graph.in_offsets[vertex + 1])
+            ):
+                self.entrances[cluster[vertex]].append(vertex)
+                self.is_entrance[vertex] = 1
+            if crossings:
+                self.crossings[vertex] = crossings
+
+        intra = {}  # Entrance -> [(entrance of the same cluster, cost)]
+        for cluster_id in range(len(self.members)):
+            intra.update(self._intra_edges(graph, costs, cluster_id))
+        edges = {
+            entrance: self._abstract_edges(entrance, intra, costs)
+            for entrances in self.entrances
+            for entrance in entrances
+        }
+        # (snapshot, lane costs, intra edges, abstract edges), replaced whole
+        self.state = (graph, costs, intra, edges)
+        self.lock = Lock()  # Serializes update_lanes; queries never take it
+
+    def _cluster_search(self, graph, costs, source, reverse=False, targets=()):
+        """Dijkstra from source that never leaves its cluster.
+
+        Returns (dist, pred) dicts; with reverse=True lanes are followed
+        backwards. Stops once every vertex in targets is settled.
+        """
+        if reverse:
+            offsets, heads = graph.in_offsets, graph.in_sources
+            lane_ids = graph.in_lane_ids
+        else:
+            offsets, heads, lane_ids = graph.offsets, graph.targets, graph.lane_ids
+        cluster_of = self.cluster
+        cluster = cluster_of[source]
+        dist, pred = {source: 0.0}, {}
+        heap = [(0.0, source)]
+        remaining = set(targets)
+
+        while heap:
+            cost, current = heapq.heappop(heap)
+            if cost > dist[current]:
+                continue  # Stale entry
+            remaining.discard(current)
+            if targets and not remaining:
+                break
+            for i in range(offsets[current], offsets[current + 1]):
+                neighbor = heads[i]
+                if cluster_of[neighbor] != cluster:
+                    continue
+                new_cost = cost + costs[lane_ids[i]]
+                if new_cost < dist.get(neighbor, INF):
+                    dist[neighbor] = new_cost
+                    pred[neighbor] = current
+                    heapq.heappush(heap, (new_cost, neighbor))
+
+        return dist, pred
+
+    def _intra_edges(self, graph, costs, cluster):
+        """Entrance-to-entrance edges of one cluster: {entrance: edges}.
+
+        Each search also tracks whether the path found to a vertex passes
+        an entrance with a cost strictly between the source's and the
+        vertex's; edges to such entrances are implied by shorter ones and
+        left out (ties are broken towards such paths).
+        """
+        offsets, heads, lane_ids = graph.offsets, graph.targets, graph.lane_ids
+        cluster_of = self.cluster
+        members = self.members[cluster]
+        local = {vertex: index for index, vertex in enumerate(members)}
+        # Lanes inside the cluster as (local head, cost), by local tail
+        adjacency = [
+            [
+                (local[heads[i]], costs[lane_ids[i]])
+                for i in range(offsets[vertex], offsets[vertex + 1])
+                if cluster_of[heads[i]] == cluster and costs[lane_ids[i]] < INF
+            ]
+            for vertex in members
+        ]
+        is_entrance = [self.is_entrance[vertex] for vertex in members]
+        entrances = [local[entrance] for entrance in self.entrances[cluster]]
+
+        result = {}
+        for source in entrances:
+            dist = [INF] * len(members)
+            via = [False] * len(members)
+            settled = [False] * len(members)
+            dist[source] = 0.0
+            heap = [(0.0, source)]
+            remaining = len(entrances)
+            while heap:
+                cost, current = heapq.heappop(heap)
+                if settled[current]:
+                    continue  # Stale entry
+                settled[current] = True
+                if is_entrance[current]:
+                    remaining -= 1
+                    if not remaining:
+                        break
+                current_via = via[current]
+                through = is_entrance[current] and cost > 0.0
+                for neighbor, lane_cost in adjacency[current]:
+                    if settled[neighbor]:
+                        continue
+                    new_cost = cost + lane_cost
+                    passes = current_via or (through and new_cost > cost)
+                    if new_cost < dist[neighbor]:
+                        dist[neighbor] = new_cost
+                        via[neighbor] = passes
+                        heapq.heappush(heap, (new_cost, neighbor))
+                    elif passes and new_cost == dist[neighbor]:
+                        via[neighbor] = True
+            result[members[source]] = [
+                (members[other], dist[other])
+                for other in entrances
+                if other != source and dist[other] < INF and not via[other]
+            ]
+        return result
+
+    def _abstract_edges(self, entrance, intra, costs):
+        """Edges of an entrance in the abstract graph: its intra-cluster
+        edges and the cheapest open lane to each entrance it crosses to."""
+        edges = list(intra.get(entrance, ()))
+        for target, lane_ids in self.crossings.get(entrance, {}).items():
+            cost = min(costs[lane_id] for lane_id in lane_ids)
+            if cost < INF:
+                edges.append((target, cost))
+        return edges
+
+    def update_lanes(self, lane_ids, graph):
+        """Pick up the cost of changed lanes from graph, the new snapshot.
+
+        The clusters containing a changed lane are rebuilt now; queries
+        keep using the previous abstract graph until the new one is
+        published.
+        """
+        with self.lock:
+            _, costs, intra, edges = self.state
+            if lane_ids:
+                costs = array("d", costs)
+                dirty, touched = set(), set()
+                for lane_id in lane_ids:
+                    costs[lane_id] = graph.lane_cost(lane_id, self.cost_model)
+                    start, end = graph.lane_start[lane_id], graph.lane_end[lane_id]
+                    if self.cluster[start] == self.cluster[end]:
+                        dirty.add(self.cluster[start])
+                    else:
+                        touched.add(start)
+
+                if dirty:
+                    intra = dict(intra)
+                    for cluster in dirty:
+                        intra.update(self._intra_edges(graph, costs, cluster))
+                        touched.update(self.entrances[cluster])
+                edges = dict(edges)
+                for entrance in touched:
+                    edges[entrance] = self._abstract_edges(entrance, intra, costs)
+            self.state = (graph, costs, intra, edges)
+
+    def query(self, start, goal, heuristic=None):
+        """Returns (path, cost) from start to goal, or (None, inf).
+
+        heuristic(v), if given, must be a consistent lower bound on the
+        cost from v to goal; it guides the abstract search.
+        """
+        if start == goal:
+            return [start], 0.0
+        if heuristic is None:
+            heuristic = lambda v: 0.0
+
+        graph, costs, _, edges = self.state  # One consistent version
+        cluster = self.cluster
+        from_start, _ = self._cluster_search(
+            graph, costs, start, targets=self.entrances[cluster[start]]
+        )
+        start_edges = list(edges.get(start, ()))
+        start_edges.extend(
+            (entrance, from_start[entrance])
+            for entrance in self.entrances[cluster[start]]
+            if entrance in from_start and entrance != start
+        )
+        goal_targets = list(self.entrances[cluster[goal]])
+        if cluster[start] == cluster[goal]:
+            goal_targets.append(start)
+        to_goal, _ = self._cluster_search(
+            graph, costs, goal, reverse=True, targets=goal_targets
+        )
+
+        # A* over the abstract graph
+        dist, pred = {start: 0.0}, {}
+        heap = [(heuristic(start), 0.0, start)]
+        while heap:
+            _, cost, current = heapq.heappop(heap)
+            if cost > dist[current]:
+                continue  # Stale entry
+            if current == goal:
+                break
+            neighbors = start_edges if current == start else edges.get(current, ())
+            if current in to_goal:
+                neighbors = [*neighbors, (goal, to_goal[current])]
+            for neighbor, edge_cost in neighbors:
+                new_cost = cost + edge_cost
+                if new_cost < dist.get(neighbor, INF):
+                    dist[neighbor] = new_cost
+                    pred[neighbor] = current
+                    heapq.heappush(
+                        heap, (new_cost + heuristic(neighbor), new_cost, neighbor)
+                    )
+        if goal not in pred:
+            return None, INF
+
+        route = [goal]
+        while route[-1] != start:
+            route.append(pred[route[-1]])
+        route.reverse()
+
+        # Refine: one in-cluster search per stretch of the route in a
+        # cluster; being part of a shortest route, it costs the same
+        path = [start]
+        stretch_start = start
+        for tail, head in zip(route, route[1:]):
+            if cluster[tail] != cluster[head]:
+                self._refine(graph, costs, stretch_start, tail, path)
+                path.append(head)  # Lane between clusters
+                stretch_start = head
+        self._refine(graph, costs, stretch_start, goal, path)
+        return path, dist[goal]
+
+    def _refine(self, graph, costs, tail, head, path):
+        """Appends the in-cluster shortest path from tail to head (without
+        tail) to path."""
+        if tail == head:
+            return
+        _, hops = self._cluster_search(graph, costs, tail, targets=(head,))
+        piece = [head]
+        while piece[-1] != tail:
+            piece.append(hops[piece[-1]])
+        path.extend(reversed(piece[:-1]))
@@ -0,0 +1,108 @@
+import heapq
+from array import array
+from threading import Lock
+
+from src.utils import search
+
+INF = search.INF
+
+
+class IncrementalPlanner:
+    """Shortest routes to one goal that are repaired, not recomputed, when
+    lane costs change (Lifelong Planning A* / D* Lite).
+
+    The search runs backwards from the goal, so g[v] is the cost v -> goal
+    and every robot heading to the goal shares the same search state. No
+    heuristic is used: robots start from many different vertices, and
+    without one the keys do not depend on the start, so D* Lite's key
+    modifier is not needed either.
+
+    After a lane change only the tail vertex of the lane is re-examined;
+    the next query propagates the difference as far as it matters for the
+    start asked about.
+    """
+
+    def __init__(self, graph, goal, cost_model):
+        self.graph = graph
+        self.goal = goal
+        self.cost_model = cost_model
+        self.costs = array("d", graph.get_lane_costs(cost_model))
+
+        n = len(graph.vertices)
+        self.g = array("d", [INF]) * n  # Cost to the goal as last expanded
+        self.rhs = array("d", [INF]) * n  # One-step lookahead of g
+        self.rhs[goal] = 0.0
+        self.heap = [(0.0, goal)]  # Inconsistent vertices keyed min(g, rhs)
+        self.lock = Lock()
+
+    def _update_vertex(self, vertex):
+        """Recompute rhs of vertex from its outgoing lanes and queue it if
+        it became inconsistent."""
+        graph, costs, g = self.graph, self.costs, self.g
+        if vertex != self.goal:
+            best = INF
+            for i in range(graph.offsets[vertex], graph.offsets[vertex + 1]):
+                cost = costs[graph.lane_ids[i]] + g[graph.targets[i]]
+                if cost < best:
+                    best = cost
+            self.rhs[vertex] = best
+        if g[vertex] != self.rhs[vertex]:
+            heapq.heappush(self.heap, (min(g[vertex], self.rhs[vertex]), vertex))
+
+    def _compute(self, start):
+        """Expand inconsistent vertices until g[start] is final."""
+        graph, g, rhs, heap = self.graph, self.g, self.rhs, self.heap
+        while heap:
+            key, vertex = heap[0]
+            if g[vertex] == rhs[vertex] or key != min(g[vertex], rhs[vertex]):
+                heapq.heappop(heap)  # Stale entry
+                continue
+            if key >= min(g[start], rhs[start]) and g[start] == rhs[start]:
+                break
+
+            heapq.heappop(heap)
+            if g[vertex] > rhs[vertex]:
+                g[vertex] = rhs[vertex]  # Cost went down: settle it
+            else:
+                g[vertex] = INF  # Cost went up: re-derive it from rhs
+                self._update_vertex(vertex)
+            for i in range(graph.in_offsets[vertex], graph.in_offsets[vertex + 1]):
+                self._update_vertex(graph.in_sources[i])
+
+    def update_lanes(self, lane_ids, graph):
+        """Pick up the cost of changed lanes from graph, the new snapshot."""
+        with self.lock:
+            self.graph = graph
+            for lane_id in lane_ids:
+                cost = graph.lane_cost(lane_id, self.cost_model)
+                if cost != self.costs[lane_id]:
+                    self.costs[lane_id] = cost
+                    self._update_vertex(graph.lane_start[lane_id])
+
+    def find_path(self, start):
+        """Returns (path, cost) from start to the goal, or (None, inf)."""
+        with self.lock:
+            graph, costs = self.graph, self.costs
+            self._compute(start)
+            g = self.g
+            if g[start] == INF:
+                return None, INF
+
+            path = [start]
+            visited = {start}
+            vertex = start
+            while vertex != self.goal:
+                # Follow the lane that realises g; lower g breaks ties so
+                # zero-cost lanes cannot send the walk in circles
+                best, best_next = (INF, INF), None
+                for i in range(graph.offsets[vertex], graph.offsets[vertex + 1]):
+                    neighbor = graph.targets[i]
+                    candidate = (costs[graph.lane_ids[i]] + g[neighbor], g[neighbor])
+                    if candidate < best and neighbor not in visited:
+                        best, best_next = candidate, neighbor
+                if best_next is None:
+                    return None, INF
+                path.append(best_next)
+                visited.add(best_next)
+                vertex = best_next
+            return path, g[start]
@@ -0,0 +1,94 @@
+import heapq
+from array import array
+
+from src.utils import search
+
+INF = search.INF
+
+
+def _lane_cost(graph, costs, start, end):
+    """Cost of the cheapest lane from start to end."""
+    return min(
+        costs[graph.lane_ids[i]]
+        for i in range(graph.offsets[start], graph.offsets[start + 1])
+        if graph.targets[i] == end
+    )
+
+
+def _spur_search(graph, spur, goal, costs, to_goal, banned_vertices, banned_next):
+    """A* from spur to goal avoiding banned_vertices, and banned_next as the
+    first hop. to_goal holds exact distances without bans, which makes it an
+    admissible and consistent heuristic."""
+    offsets, targets, lane_ids = graph.offsets, graph.targets, graph.lane_ids
+    dist = array("d", [INF]) * (len(offsets) - 1)
+    pred = array("i", [-1]) * (len(offsets) - 1)
+    dist[spur] = 0.0
+    heap = [(to_goal[spur], 0.0, spur)]
+
+    while heap:
+        _, cost, current = heapq.heappop(heap)
+        if cost > dist[current]:
+            continue  # Stale entry
+        if current == goal:
+            return search.unpack_path(pred, spur, goal), cost
+
+        for i in range(offsets[current], offsets[current + 1]):
+            neighbor = targets[i]
+            if neighbor in banned_vertices or (
+                current == spur and neighbor in banned_next
+            ):
+                continue
+            new_cost = cost + costs[lane_ids[i]]
+            if new_cost < dist[neighbor] and to_goal[neighbor] < INF:
+                dist[neighbor] = new_cost
+                pred[neighbor] = current
+                heapq.heappush(
+                    heap, (new_cost + to_goal[neighbor], new_cost, neighbor)
+                )
+
+    return None, INF
+
+
+def k_shortest_paths(graph, start, goal, costs, k):
+    """Yen's algorithm: up to k cheapest loopless routes from start to goal.
+
+    Returns ``[(path, cost), ...]`` in order of increasing cost. Every spur
+    search reuses one reverse shortest path tree to the goal as its A*
+    heuristic; the tree distances are exact without the spur bans, so the
+    searches head straight for the goal and only detour where a ban forces
+    them to.
+    """
+    to_goal, succ, _ = search.shortest_path_tree(graph, goal, costs, reverse=True)
+    if k <= 0 or to_goal[start] == INF:
+        return []
+
+    first = [start]
+    while first[-1] != goal:
+        first.append(succ[first[-1]])
+    found = [(first, to_goal[start])]
+    candidates = []  # Heap of (cost, path)
+    seen = {tuple(first)}
+
+    while len(found) < k:
+        previous, _ = found[-1]
+        root_cost = 0.0
+        for i, spur in enumerate(previous[:-1]):
+            root = previous[: i + 1]
+            # Lanes already taken from this root by earlier routes
+            banned_next = {path[i + 1] for path, _ in found if path[: i + 1] == root}
+            spur_path, spur_cost = _spur_search(
+                graph, spur, goal, costs, to_goal, set(root[:-1]), banned_next
+            )
+            if spur_path is not None:
+                path = root[:-1] + spur_path
+                if tuple(path) not in seen:
+                    seen.add(tuple(path))
+                    heapq.heappush(candidates, (root_cost + spur_cost, path))
+            root_cost += _lane_cost(graph, costs, spur, previous[i + 1])
+
+        if not candidates:
+            break
+        cost, path = heapq.heappop(candidates)
+        found.append((path, cost))
+
+    return found
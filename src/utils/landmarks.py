@@ -0,0 +1,83 @@
+from array import array
+
+from src.utils import search
+
+INF = search.INF
+
+
+class LandmarkTable:
+    """ALT lower bounds from distances to and from a few landmark vertices.
+
+    For every landmark L the triangle inequality gives
+    ``d(u, v) >= d(u, L) - d(v, L)`` and ``d(u, v) >= d(L, v) - d(L, u)``.
+    Distances are taken from the lane costs of the source file, so the
+    bounds stay valid while lanes are closed or slowed down.
+    """
+
+    def __init__(self, cost_model, landmarks, dist_from, dist_to, vertex_count):
+        self.cost_model = cost_model
+        self.landmarks = landmarks
+        self.vertex_count = vertex_count
+        # Row i holds d(landmarks[i], v) and d(v, landmarks[i]) respectively
+        self.dist_from = dist_from
+        self.dist_to = dist_to
+
+    @classmethod
+    def build(cls, graph, cost_model, count=8):
+        """Pick landmarks by farthest-point selection and store their distances."""
+        costs = search.lane_costs(graph, cost_model)
+        n = len(graph.vertices)
+        landmarks = []
+        dist_from = array("d")
+        dist_to = array("d")
+        if n == 0:
+            return cls(cost_model, landmarks, dist_from, dist_to, n)
+
+        # Start from the vertex farthest away from an arbitrary vertex
+        seed_dist, _, _ = search.shortest_path_tree(graph, 0, costs)
+        candidate = max(range(n), key=seed_dist.__getitem__)
+        nearest = array("d", [INF]) * n  # Distance from the closest landmark
+
+        while len(landmarks) < min(count, n):
+            landmarks.append(candidate)
+            forward, _, _ = search.shortest_path_tree(graph, candidate, costs)
+            backward, _, _ = search.shortest_path_tree(
+                graph, candidate, costs, reverse=True
+            )
+            dist_from.extend(forward)
+            dist_to.extend(backward)
+
+            for v in range(n):
+                if forward[v] < nearest[v]:
+                    nearest[v] = forward[v]
+            nearest[candidate] = -1.0  # Never pick a landmark twice
+            # Unreached vertices (inf) are preferred: they cover new ground
+            candidate = max(range(n), key=nearest.__getitem__)
+
+        return cls(cost_model, landmarks, dist_from, dist_to, n)
+
+    def lower_bound(self, u, v):
+        """Largest landmark lower bound on the cost of the route u -> v."""
+        n = self.vertex_count
+        dist_from, dist_to = self.dist_from, self.dist_to
+        best = 0.0
+        for row in range(0, len(self.landmarks) * n, n):
+            u_to, v_to = dist_to[row + u], dist_to[row + v]
+            if u_to < INF and v_to < INF and u_to - v_to > best:
+                best = u_to - v_to
+            u_from, v_from = dist_from[row + u], dist_from[row + v]
+            if u_from < INF and v_from < INF and v_from - u_from > best:
+                best = v_from - u_from
+        return best
+
+    def heuristic_to(self, goal, fallback=None):
+        """Returns h(v) bounding v -> goal, never weaker than fallback(v)."""
+        if fallback is None:
+            return lambda v: self.lower_bound(v, goal)
+        return lambda v: max(self.lower_bound(v, goal), fallback(v))
+
+    def heuristic_from(self, start, fallback=None):
+        """Returns h(v) bounding start -> v, never weaker than fallback(v)."""
+        if fallback is None:
+            return lambda v: self.lower_bound(start, v)
+        return lambda v: max(self.lower_bound(start, v), fallback(v))
@@ -0,0 +1,300 @@
+import heapq
+import math
+from array import array
+
+INF = math.inf
+
+# "hops": every lane costs 1, "distance": Euclidean lane length,
+# "time": lane length / speed_limit
+COST_MODELS = ("hops", "distance", "time")
+
+# "dijkstra": uninformed search, "astar": A* guided by vertex coordinates,
+# "bidirectional"/"bidirectional_astar": both searched from each end,
+# "ch": contraction hierarchy query (see src/utils/contraction.py),
+# "hpa": hierarchical search over spatial clusters (see src/utils/hierarchical.py)
+ALGORITHMS = (
+    "dijkstra",
+    "astar",
+    "bidirectional",
+    "bidirectional_astar",
+    "ch",
+    "hpa",
+)
+
+# Speed assumed for lanes whose speed_limit is missing or not positive
+DEFAULT_SPEED = 1.0
+
+
+def check_cost_model(cost_model):
+    """Raise ValueError for an unknown cost model name."""
+    if cost_model not in COST_MODELS:
+        raise ValueError(
+            f"Unknown cost model '{cost_model}'. Available models: {list(COST_MODELS)}"
+        )
+
+
+def check_algorithm(algorithm):
+    """Raise ValueError for an unknown search algorithm name."""
+    if algorithm not in ALGORITHMS:
+        raise ValueError(
+            f"Unknown algorithm '{algorithm}'. Available algorithms: {list(ALGORITHMS)}"
+        )
+
+
+def lane_speed(speed_limit):
+    """Effective travel speed of a lane."""
+    return speed_limit if speed_limit > 0 else DEFAULT_SPEED
+
+
+def lane_costs(graph, cost_model):
+    """Build the per-lane traversal cost array of a graph for a cost model."""
+    check_cost_model(cost_model)
+    if cost_model == "hops":
+        return array("d", [1.0]) * len(graph.lane_start)
+    if cost_model == "distance":
+        return array("d", graph.lane_length)
+    return array(
+        "d",
+        (
+            length / lane_speed(speed)
+            for length, speed in zip(graph.lane_length, graph.lane_speed)
+        ),
+    )
+
+
+def lane_cost(graph, lane_id, cost_model, speed_limit=None):
+    """Traversal cost of one lane; speed_limit replaces the lane's own."""
+    check_cost_model(cost_model)
+    if cost_model == "hops":
+        return 1.0
+    length = graph.lane_length[lane_id]
+    if cost_model == "time":
+        if speed_limit is None:
+            speed_limit = graph.lane_speed[lane_id]
+        length /= lane_speed(speed_limit)
+    return length
+
+
+def heuristic_scale(graph, cost_model):
+    """Factor turning straight-line distance into a lower bound on cost.
+
+    Distances are bounded by the fastest lane for "time" and by the longest
+    lane for "hops", which keeps the heuristic admissible and consistent.
+    """
+    check_cost_model(cost_model)
+    if cost_model == "distance":
+        return 1.0
+    if cost_model == "time":
+        return 1.0 / max(map(lane_speed, graph.lane_speed), default=DEFAULT_SPEED)
+
+    longest = max(graph.lane_length, default=0.0)
+    return 1.0 / longest if longest > 0 else 0.0
+
+
+def euclidean_heuristic(graph, goal, scale):
+    """Returns h(v): scaled straight-line distance from v to goal."""
+    xs, ys = graph.vertex_x, graph.vertex_y
+    goal_x, goal_y = xs[goal], ys[goal]
+    return lambda v: scale * math.hypot(goal_x - xs[v], goal_y - ys[v])
+
+
+def average_potential(to_goal, from_start):
+    """Returns the forward potential p(v) used by bidirectional A*.
+
+    to_goal(v) and from_start(v) bound the cost v -> goal and start -> v
+    from below. p(v) = (to_goal(v) - from_start(v)) / 2 is consistent for
+    both the forward search and the backward search (which uses -p(v)).
+    """
+    return lambda v: 0.5 * (to_goal(v) - from_start(v))
+
+
+def unpack_path(pred, start, goal):
+    """Rebuild the vertex path to goal by following predecessor links."""
+    path = [goal]
+    while path[-1] != start:
+        path.append(pred[path[-1]])
+    path.reverse()
+    return path
+
+
+def shortest_path_tree(graph, source, costs, reverse=False, targets=None):
+    """Single-source Dijkstra over the whole reachable part of a graph.
+
+    Returns ``(dist, pred, order)``: distance and predecessor arrays plus the
+    vertices in the order they were settled. With reverse=True lanes are
+    followed backwards, giving distances *to* source and successor links.
+    With targets, the search stops as soon as every target is settled.
+    """
+    if reverse:
+        offsets, heads = graph.in_offsets, graph.in_sources
+        lane_ids = graph.in_lane_ids
+    else:
+        offsets, heads, lane_ids = graph.offsets, graph.targets, graph.lane_ids
+    dist = array("d", [INF]) * (len(offsets) - 1)
+    pred = array("i", [-1]) * (len(offsets) - 1)
+    dist[source] = 0.0
+    heap = [(0.0, source)]
+    order = []
+    remaining = set(targets) if targets is not None else None
+
+    while heap:
+        cost, current = heapq.heappop(heap)
+        if cost > dist[current]:
+            continue  # Stale entry
+        order.append(current)
+        if remaining is not None:
+            remaining.discard(current)
+            if not remaining:
+                break
+
+        for i in range(offsets[current], offsets[current + 1]):
+            neighbor = heads[i]
+            new_cost = cost + costs[lane_ids[i]]
+            if new_cost < dist[neighbor]:
+                dist[neighbor] = new_cost
+                pred[neighbor] = current
+                heapq.heappush(heap, (new_cost, neighbor))
+
+    return dist, pred, order
+
+
+def dijkstra(graph, start, goal, costs):
+    """Point-to-point Dijkstra over the CSR arrays of a graph.
+
+    Uses a lazy heap (stale entries are skipped instead of decreased) and
+    a predecessor array, and stops as soon as the goal is settled.
+    Returns ``(path, cost)``, or ``(None, INF)`` when goal is unreachable.
+    """
+    offsets, targets, lane_ids = graph.offsets, graph.targets, graph.lane_ids
+    dist = array("d", [INF]) * (len(offsets) - 1)
+    pred = array("i", [-1]) * (len(offsets) - 1)
+    dist[start] = 0.0
+    heap = [(0.0, start)]
+
+    while heap:
+        cost, current = heapq.heappop(heap)
+        if cost > dist[current]:
+            continue  # Stale entry
+        if current == goal:
+            return unpack_path(pred, start, goal), cost
+
+        for i in range(offsets[current], offsets[current + 1]):
+            neighbor = targets[i]
+            new_cost = cost + costs[lane_ids[i]]
+            if new_cost < dist[neighbor]:
+                dist[neighbor] = new_cost
+                pred[neighbor] = current
+                heapq.heappush(heap, (new_cost, neighbor))
+
+    return None, INF
+
+
+def astar(graph, start, goal, costs, heuristic):
+    """Point-to-point A* over the CSR arrays of a graph.
+
+    heuristic(v) must never overestimate the cost from v to goal. Like
+    dijkstra(), uses a lazy heap and predecessor array and returns
+    ``(path, cost)``, or ``(None, INF)`` when goal is unreachable.
+    """
+    offsets, targets, lane_ids = graph.offsets, graph.targets, graph.lane_ids
+    dist = array("d", [INF]) * (len(offsets) - 1)
+    pred = array("i", [-1]) * (len(offsets) - 1)
+    dist[start] = 0.0
+    heap = [(heuristic(start), 0.0, start)]
+
+    while heap:
+        _, cost, current = heapq.heappop(heap)
+        if cost > dist[current]:
+            continue  # Stale entry
+        if current == goal:
+            return unpack_path(pred, start, goal), cost
+
+        for i in range(offsets[current], offsets[current + 1]):
+            neighbor = targets[i]
+            new_cost = cost + costs[lane_ids[i]]
+            if new_cost < dist[neighbor]:
+                dist[neighbor] = new_cost
+                pred[neighbor] = current
+                heapq.heappush(
+                    heap, (new_cost + heuristic(neighbor), new_cost, neighbor)
+                )
+
+    return None, INF
+
+
+def bidirectional(graph, start, goal, costs, potential=None):
+    """Point-to-point search run forward from start and backward from goal.
+
+    The backward search follows lanes in reverse through the incoming CSR
+    arrays, so one-way lanes are respected. With a potential p(v) (see
+    average_potential) both halves become A* searches. The search stops once
+    the smallest forward and backward keys together reach the best meeting
+    cost, which guarantees an optimal path. Returns ``(path, cost)``, or
+    ``(None, INF)`` when goal is unreachable.
+    """
+    if start == goal:
+        return [start], 0.0
+    if potential is None:
+        potential = lambda v: 0.0
+
+    offsets, targets, lane_ids = graph.offsets, graph.targets, graph.lane_ids
+    in_offsets, in_sources = graph.in_offsets, graph.in_sources
+    in_lane_ids = graph.in_lane_ids
+    vertex_count = len(offsets) - 1
+
+    dist_forward = array("d", [INF]) * vertex_count
+    dist_backward = array("d", [INF]) * vertex_count
+    pred = array("i", [-1]) * vertex_count  # Previous vertex, forward tree
+    succ = array("i", [-1]) * vertex_count  # Next vertex, backward tree
+    dist_forward[start] = 0.0
+    dist_backward[goal] = 0.0
+    heap_forward = [(potential(start), 0.0, start)]
+    heap_backward = [(-potential(goal), 0.0, goal)]
+    best, meeting = INF, -1
+
+    while heap_forward and heap_backward:
+        if heap_forward[0][0] + heap_backward[0][0] >= best:
+            break
+
+        if heap_forward[0][0] <= heap_backward[0][0]:
+            _, cost, current = heapq.heappop(heap_forward)
+            if cost > dist_forward[current]:
+                continue  # Stale entry
+            for i in range(offsets[current], offsets[current + 1]):
+                neighbor = targets[i]
+                new_cost = cost + costs[lane_ids[i]]
+                if new_cost < dist_forward[neighbor]:
+                    dist_forward[neighbor] = new_cost
+                    pred[neighbor] = current
+                    heapq.heappush(
+                        heap_forward,
+                        (new_cost + potential(neighbor), new_cost, neighbor),
+                    )
+                    if new_cost + dist_backward[neighbor] < best:
+                        best = new_cost + dist_backward[neighbor]
+                        meeting = neighbor
+        else:
+            _, cost, current = heapq.heappop(heap_backward)
+            if cost > dist_backward[current]:
+                continue  # Stale entry
+            for i in range(in_offsets[current], in_offsets[current + 1]):
+                neighbor = in_sources[i]
+                new_cost = cost + costs[in_lane_ids[i]]
+                if new_cost < dist_backward[neighbor]:
+                    dist_backward[neighbor] = new_cost
+                    succ[neighbor] = current
+                    heapq.heappush(
+                        heap_backward,
+                        (new_cost - potential(neighbor), new_cost, neighbor),
+                    )
+                    if new_cost + dist_forward[neighbor] < best:
+                        best = new_cost + dist_forward[neighbor]
+                        meeting = neighbor
+
+    if meeting < 0:
+        return None, INF
+
+    path = unpack_path(pred, start, meeting)
+    while path[-1] != goal:
+        path.append(succ[path[-1]])
+    return path, best
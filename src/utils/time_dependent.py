@@ -0,0 +1,175 @@
+"""Time-dependent lane costs: congestion profiles by time of day.
+
+A profile is a periodic piecewise-linear factor applied to the "time" cost
+of the lanes it is attached to, e.g. 2.5 while an aisle is busy with a
+shift change. Profiles are loaded from a JSON file::
+
+    {
+        "period": 86400,
+        "profiles": {
+            "shift_change": [[0, 1.0], [27000, 1.0], [28800, 2.5], [30600, 1.0]]
+        },
+        "levels": {
+            "level1": [[0, 1, "shift_change"], [1, 0, "shift_change"]]
+        }
+    }
+
+Breakpoints are ``[time of day, factor]`` in the units of the "time" cost
+model (lane length / speed limit); the factor between breakpoints is
+interpolated and wraps around from the last breakpoint to the first one of
+the next period. "levels" lists ``[start, end, profile name]`` per lane.
+"""
+
+import heapq
+import json
+from array import array
+from bisect import bisect_right
+
+from src.utils import search
+
+INF = search.INF
+
+# Searches available for time-dependent queries
+ALGORITHMS = ("dijkstra", "astar")
+
+DEFAULT_PERIOD = 86400.0  # One day in seconds
+
+
+class CongestionProfile:
+    """Periodic piecewise-linear cost factor f(t) of a lane.
+
+    Traversing a lane entered at time t takes ``base * f(t)`` where base is
+    the lane's static "time" cost.
+    """
+
+    def __init__(self, points, period=DEFAULT_PERIOD, name=""):
+        self.name = name
+        self.period = float(period)
+        if self.period <= 0:
+            raise ValueError(f"Profile '{name}': period must be positive")
+        if not points:
+            raise ValueError(f"Profile '{name}' has no breakpoints")
+        points = sorted((float(t), float(factor)) for t, factor in points)
+        if any(not 0 <= t < self.period for t, _ in points):
+            raise ValueError(f"Profile '{name}': times must lie in [0, {period})")
+        if any(first[0] == second[0] for first, second in zip(points, points[1:])):
+            raise ValueError(f"Profile '{name}' repeats a breakpoint time")
+        if any(factor <= 0 for _, factor in points):
+            raise ValueError(f"Profile '{name}': factors must be positive")
+
+        self.times = array("d", (t for t, _ in points))
+        self.factors = array("d", (factor for _, factor in points))
+        self.min_factor = min(self.factors)
+        # Steepest decrease of the factor per unit of time (0 if none)
+        self.max_drop = max(
+            (
+                (factor - next_factor) / (next_t - t)
+                for (t, factor), (next_t, next_factor) in self._segments()
+            ),
+            default=0.0,
+        )
+
+    def _segments(self):
+        """Consecutive breakpoint pairs, including the wrap-around one."""
+        points = list(zip(self.times, self.factors))
+        if len(points) < 2:
+            return []
+        first_t, first_factor = points[0]
+        wrapped = points[1:] + [(first_t + self.period, first_factor)]
+        return list(zip(points, wrapped))
+
+    def factor(self, t):
+        """Cost factor for a lane entered at time t."""
+        times, factors = self.times, self.factors
+        t %= self.period
+        i = bisect_right(times, t) - 1
+        if i < 0:
+            # Before the first breakpoint: between the last one and the wrap
+            t += self.period
+            i = len(times) - 1
+        if len(times) == 1:
+            return factors[0]
+        if i + 1 < len(times):
+            next_t, next_factor = times[i + 1], factors[i + 1]
+        else:
+            next_t, next_factor = times[0] + self.period, factors[0]
+        share = (t - times[i]) / (next_t - times[i])
+        return factors[i] + share * (next_factor - factors[i])
+
+    def check_fifo(self, base, lane=""):
+        """Raise ValueError unless entering the lane later never means
+        leaving it earlier, i.e. ``t + base * f(t)`` is non-decreasing."""
+        if base < INF and base * self.max_drop > 1.0:
+            raise ValueError(
+                f"Profile '{self.name}' breaks FIFO order on lane {lane}: its "
+                f"cost drops faster than time passes"
+            )
+
+
+def load_profiles(path):
+    """Read a profile file; returns ``{level name: [(start, end, profile)]}``."""
+    with open(path, "rb") as file:
+        data = json.loads(file.read())
+    period = data.get("period", DEFAULT_PERIOD)
+    profiles = {
+        name: CongestionProfile(points, period, name)
+        for name, points in data.get("profiles", {}).items()
+    }
+
+    levels = {}
+    for level_name, lanes in data.get("levels", {}).items():
+        entries = levels[level_name] = []
+        for start, end, name in lanes:
+            if name not in profiles:
+                raise ValueError(
+                    f"Lane {start} -> {end} on '{level_name}' uses unknown "
+                    f"profile '{name}'. Available profiles: {list(profiles)}"
+                )
+            entries.append((start, end, profiles[name]))
+    return levels
+
+
+def travel_time_function(costs, profiles):
+    """Returns tt(lane_id, t): static cost times the lane's profile factor."""
+
+    def travel_time(lane_id, t):
+        profile = profiles.get(lane_id)
+        if profile is None:
+            return costs[lane_id]
+        return costs[lane_id] * profile.factor(t)
+
+    return travel_time
+
+
+def earliest_arrival(graph, start, goal, departure, travel_time, heuristic=None):
+    """Time-dependent Dijkstra (A* with heuristic) from start at departure.
+
+    Labels are arrival times; with FIFO lanes the first time goal is
+    settled is its earliest arrival. heuristic(v) must be a consistent
+    lower bound on the travel time v -> goal at any time of day. Returns
+    ``(path, arrival)``, or ``(None, INF)`` when goal is unreachable.
+    """
+    if heuristic is None:
+        heuristic = lambda v: 0.0
+    offsets, targets, lane_ids = graph.offsets, graph.targets, graph.lane_ids
+    arrival = array("d", [INF]) * (len(offsets) - 1)
+    pred = array("i", [-1]) * (len(offsets) - 1)
+    arrival[start] = departure
+    heap = [(departure + heuristic(start), departure, start)]
+
+    while heap:
+        _, t, current = heapq.heappop(heap)
+        if t > arrival[current]:
+            continue  # Stale entry
+        if current == goal:
+            return search.unpack_path(pred, start, goal), t
+
+        for i in range(offsets[current], offsets[current + 1]):
+            neighbor = targets[i]
+            new_t = t + travel_time(lane_ids[i], t)
+            if new_t < arrival[neighbor]:
+                arrival[neighbor] = new_t
+                pred[neighbor] = current
+                heapq.heappush(heap, (new_t + heuristic(neighbor), new_t, neighbor))
+
+    return None, INF
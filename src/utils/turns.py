@@ -0,0 +1,90 @@
+import heapq
+import math
+from array import array
+from bisect import bisect_left
+
+from src.utils import search
+
+INF = search.INF
+
+
+class TurnPenalties:
+    """Extra cost of a turn between consecutive lanes, by angle bucket.
+
+    buckets is a sequence of ``(max_angle, penalty)`` with angles in degrees
+    (0 = straight on, 180 = U-turn); a turn costs the penalty of the first
+    bucket whose max_angle it does not exceed. Penalties are in the units
+    of the cost model they are used with and are added to the lane costs.
+    """
+
+    def __init__(self, buckets=((20, 0.0), (60, 0.5), (120, 1.0), (180, 2.0))):
+        buckets = sorted((float(angle), float(penalty)) for angle, penalty in buckets)
+        if not buckets or buckets[-1][0] < 180:
+            raise ValueError("Turn penalty buckets must cover angles up to 180")
+        if any(penalty < 0 for _, penalty in buckets):
+            raise ValueError("Turn penalties must not be negative")
+        self.buckets = buckets
+        self.limits = array("d", (math.radians(angle) for angle, _ in buckets))
+        self.penalties = array("d", (penalty for _, penalty in buckets))
+
+    def penalty(self, heading_in, heading_out):
+        """Penalty for leaving a lane heading heading_in (radians) onto a
+        lane heading heading_out."""
+        turn = abs(heading_out - heading_in) % (2 * math.pi)
+        turn = min(turn, 2 * math.pi - turn)
+        i = bisect_left(self.limits, turn - 1e-9)
+        return self.penalties[min(i, len(self.penalties) - 1)]
+
+
+def turn_aware_search(graph, start, goal, costs, penalties, heuristic=None):
+    """Edge-based Dijkstra (A* with heuristic) charging turn penalties.
+
+    Search states are lanes rather than vertices: dist[lane] is the cost of
+    arriving at the end of lane, so the penalty of the next turn is known
+    from the lane arrived by. The first lane of a route has no turn.
+    heuristic(v) must be a consistent lower bound on the lane cost from
+    vertex v to goal. Returns ``(path, cost)``, or ``(None, INF)`` when goal
+    is unreachable.
+    """
+    if start == goal:
+        return [start], 0.0
+    if heuristic is None:
+        heuristic = lambda v: 0.0
+    offsets, targets, lane_ids = graph.offsets, graph.targets, graph.lane_ids
+    lane_end, headings = graph.lane_end, graph.lane_heading
+    dist = array("d", [INF]) * len(lane_end)
+    pred = array("i", [-1]) * len(lane_end)  # Lane arrived by before lane
+    heap = []
+    for i in range(offsets[start], offsets[start + 1]):
+        lane_id, neighbor = lane_ids[i], targets[i]
+        cost = costs[lane_id]
+        if cost < dist[lane_id]:
+            dist[lane_id] = cost
+            heapq.heappush(heap, (cost + heuristic(neighbor), cost, lane_id))
+
+    while heap:
+        _, cost, lane_id = heapq.heappop(heap)
+        if cost > dist[lane_id]:
+            continue  # Stale entry
+        current = lane_end[lane_id]
+        if current == goal:
+            path = [goal]
+            while lane_id >= 0:
+                lane_id = pred[lane_id]
+                path.append(lane_end[lane_id] if lane_id >= 0 else start)
+            path.reverse()
+            return path, cost
+
+        heading = headings[lane_id]
+        for i in range(offsets[current], offsets[current + 1]):
+            next_lane = lane_ids[i]
+            turn = penalties.penalty(heading, headings[next_lane])
+            new_cost = cost + costs[next_lane] + turn
+            if new_cost < dist[next_lane]:
+                dist[next_lane] = new_cost
+                pred[next_lane] = lane_id
+                heapq.heappush(
+                    heap, (new_cost + heuristic(targets[i]), new_cost, next_lane)
+                )
+
+    return None, INF
@@ -0,0 +1,32 @@
+import json
+import os
+import sys
+
+import pytest
+
+# The modules import each other as src.*, from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.graph_generator import write_graph  # noqa: E402
+
+
+@pytest.fixture
+def graph_file(tmp_path):
+    """Returns write(levels, connectors=()) -> path of a nav graph file."""
+    path = tmp_path / "graph.json"
+
+    def write(levels, connectors=()):
+        if connectors:
+            data = {"levels": levels, "connectors": list(connectors)}
+            path.write_text(json.dumps(data))
+        else:
+            write_graph(path, levels)
+        return str(path)
+
+    return write
+
+
+@pytest.fixture(autouse=True)
+def _in_tmp_path(tmp_path, monkeypatch):
+    # Robots write their logs to the working directory
+    monkeypatch.chdir(tmp_path)
@@ -0,0 +1,19 @@
+"""Small hand-made levels shared by the tests."""
+
+
+def line(count):
+    """Two-way lanes joining vertices 0, 1, ..., count - 1 along the x axis."""
+    lanes = [[i, i + 1, {}] for i in range(count - 1)]
+    lanes += [[i + 1, i, {}] for i in range(count - 1)]
+    return {"vertices": [[i, 0, {"name": ""}] for i in range(count)], "lanes": lanes}
+
+
+def line_with_detour():
+    """line(3) plus a longer way round 0 -> 3 -> 2."""
+    level = line(3)
+    level["vertices"].append([1, 1, {"name": ""}])
+    level["lanes"] += [[0, 3, {}], [3, 2, {}]]
+    return level
+
+
+LIFT = {"name": "lift", "vertices": {"A": 2, "B": 0}}
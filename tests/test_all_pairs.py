@@ -0,0 +1,47 @@
+import glob
+
+import pytest
+
+from src.models.nav_graph import NavGraph
+from src.utils.all_pairs import AllPairsTable
+from src.utils.graph_generator import warehouse_grid
+
+
+def test_tables_are_saved_and_reloaded(graph_file, monkeypatch):
+    path = graph_file({"level1": warehouse_grid(6, 6, seed=1)})
+    graph = NavGraph(path, cost_model="distance", precompute=True)
+    assert len(glob.glob("*.apsp")) == 1
+
+    def build(*args):
+        raise AssertionError("The saved table should have been loaded")
+
+    monkeypatch.setattr(AllPairsTable, "build", build)
+    reloaded = NavGraph(path, cost_model="distance", precompute=True)
+    for start in range(0, 36, 5):
+        for destination in range(36):
+            expected = graph.find_path(start, destination, algorithm="dijkstra")
+            assert reloaded.get_distance(start, destination) == pytest.approx(
+                expected[1]
+            )
+            assert reloaded.find_path(start, destination)[1] == pytest.approx(
+                expected[1]
+            )
+
+
+def test_tables_follow_lane_changes(graph_file):
+    graph = NavGraph(graph_file({"level1": warehouse_grid(6, 6, seed=2)}))
+    graph.precompute_all_pairs()
+    graph.close_lane(0, 1)
+    graph.close_lane(0, 6)
+
+    assert graph.get_distance(0, 35) == float("inf")
+    assert graph.find_path(0, 35) == (None, float("inf"))
+
+
+def test_stale_tables_are_removed(graph_file):
+    NavGraph(graph_file({"level1": warehouse_grid(6, 6, seed=3)}), precompute=True)
+    old = glob.glob("*.apsp")
+    NavGraph(graph_file({"level1": warehouse_grid(6, 6, seed=4)}), precompute=True)
+
+    tables = glob.glob("*.apsp")
+    assert len(tables) == 1 and tables != old
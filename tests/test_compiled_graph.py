@@ -0,0 +1,57 @@
+import glob
+import os
+
+from src.models.compiled_graph import FORMAT_VERSION, save_compiled
+from src.models.nav_graph import NavGraph
+from src.utils.graph_generator import aisle_layout, warehouse_grid
+
+
+def test_compiled_level_matches_parsed_json(graph_file):
+    path = graph_file({"level1": aisle_layout(5, 12, seed=1)})
+    parsed = NavGraph(path, use_compiled=False)
+    NavGraph(path)  # Writes the compiled copy
+    mapped = NavGraph(path)
+
+    compiled_path = mapped.compiled_path()
+    assert os.path.exists(compiled_path)
+    assert f".v{FORMAT_VERSION}." in os.path.basename(compiled_path)
+    assert isinstance(mapped.snapshot.vertex_x, memoryview)  # Not parsed
+
+    assert dict(mapped.vertices) == dict(parsed.vertices)
+    assert mapped.get_lanes() == parsed.get_lanes()
+    assert list(mapped.snapshot.lane_properties) == list(
+        parsed.snapshot.lane_properties
+    )
+    assert mapped.snapshot.lane_conflicts == parsed.snapshot.lane_conflicts
+    assert list(mapped.snapshot.lane_length) == list(parsed.snapshot.lane_length)
+    for start, destination in [(0, 50), (7, 3), (20, 61)]:
+        assert mapped.find_path(start, destination) == parsed.find_path(
+            start, destination
+        )
+
+
+def test_rewriting_a_compiled_file_keeps_mapped_graphs_readable(graph_file):
+    path = graph_file({"level1": warehouse_grid(20, 20, seed=1)})
+    NavGraph(path)
+    mapped = NavGraph(path)
+    expected = list(mapped.snapshot.vertex_x)
+
+    # Another process rewriting the file (here with a much smaller level)
+    smaller = NavGraph(
+        graph_file({"level1": warehouse_grid(2, 2)}), use_compiled=False
+    )
+    save_compiled(mapped.compiled_path(), smaller.snapshot)
+
+    assert list(mapped.snapshot.vertex_x) == expected
+    assert not glob.glob(os.path.join(os.path.dirname(path), "*.tmp"))
+
+
+def test_edits_replace_the_compiled_file(graph_file):
+    path = graph_file({"level1": warehouse_grid(4, 4, seed=1)})
+    first = NavGraph(path).compiled_path()
+    graph_file({"level1": warehouse_grid(4, 4, seed=2)})
+    second = NavGraph(path).compiled_path()
+
+    assert first != second
+    assert not os.path.exists(first)
+    assert os.path.exists(second)
@@ -0,0 +1,55 @@
+import random
+
+from levels import line
+from src.controllers.fleet_manager import FleetManager
+from src.models.nav_graph import NavGraph
+from src.utils import search
+from src.utils.graph_generator import warehouse_grid
+
+
+def test_unreachable_destination_is_rejected(graph_file, capsys):
+    level = line(3)
+    level["vertices"].append([5, 5, {"name": ""}])  # No lanes
+    fleet_manager = FleetManager(graph_file({"A": level}), "A")
+    fleet_manager.spawn_robot(0)
+    fleet_manager.assign_task("R1", 3)
+
+    assert "unreachable" in capsys.readouterr().out
+    assert fleet_manager.robots["R1"].destination is None
+    assert fleet_manager.graph.find_path(0, 3) == (None, search.INF)
+
+
+def test_closing_lanes_keeps_sound_labels(graph_file):
+    graph = NavGraph(graph_file({"level1": warehouse_grid(8, 8, seed=1)}))
+    labels = graph.snapshot.components()
+    rng = random.Random(2)
+    lanes = graph.get_lanes()
+
+    for step in range(30):
+        lane = rng.choice(lanes)
+        graph.close_lane(lane["start"], lane["end"])
+        snapshot = graph.snapshot
+        assert snapshot.components() is labels
+        for _ in range(20):
+            start, destination = rng.randrange(64), rng.randrange(64)
+            if snapshot.unreachable(start, destination):
+                _, cost = graph.find_path(start, destination, algorithm="dijkstra")
+                assert cost == search.INF
+
+
+def test_component_info_follows_closures(graph_file):
+    graph = NavGraph(graph_file({"level1": line(3)}))
+    labels = graph.snapshot.components()
+    assert graph.component_info()["strong_components"] == 1
+
+    graph.close_lane(1, 2)
+    info = graph.component_info()
+    assert info["strong_components"] == 2
+    assert info["outside_largest"] == [2]
+    # Exact labels are also the tighter ones for later queries
+    assert graph.snapshot.unreachable(0, 2)
+
+    graph.reopen_lane(1, 2)
+    assert graph.snapshot.components() is not labels
+    assert graph.component_info()["strongly_connected"]
+    assert not graph.snapshot.unreachable(0, 2)
@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from src.models.nav_graph import NavGraph
+from src.utils.graph_generator import aisle_layout
+
+
+def expected_matrix(graph, sources, targets):
+    return [
+        [graph.find_path(start, end, algorithm="dijkstra")[1] for end in targets]
+        for start in sources
+    ]
+
+
+@pytest.mark.parametrize(
+    "source_count, target_count",
+    [(3, 12), (12, 3)],  # Forward searches, then reverse ones
+)
+def test_cost_matrix_matches_dijkstra(graph_file, source_count, target_count):
+    graph = NavGraph(
+        graph_file({"level1": aisle_layout(6, 20, seed=2)}), cost_model="distance"
+    )
+    rng = random.Random(3)
+    n = len(graph.vertices)
+    lanes = graph.get_lanes()
+    for lane in rng.sample(lanes, 10):
+        graph.close_lane(lane["start"], lane["end"])
+
+    sources = [rng.randrange(n) for _ in range(source_count)]
+    targets = [rng.randrange(n) for _ in range(target_count)]
+    # Repeated and unknown vertices
+    sources += [sources[0], n + 5]
+    targets += [targets[-1], -1]
+
+    matrix = graph.cost_matrix(sources, targets)
+    expected = expected_matrix(graph, sources, targets)
+    assert len(matrix) == len(sources)
+    for row, expected_row in zip(matrix, expected):
+        assert row == pytest.approx(expected_row)
+    assert matrix[-1] == [float("inf")] * len(targets)
+
+
+def test_cost_matrix_uses_all_pairs_tables(graph_file):
+    graph = NavGraph(
+        graph_file({"level1": aisle_layout(4, 10, seed=4)}), precompute=True
+    )
+    vertices = list(graph.vertices)
+    sources, targets = vertices[:5], vertices[-7:]
+
+    # Hop counts: exact
+    assert graph.cost_matrix(sources, targets) == expected_matrix(
+        graph, sources, targets
+    )
+    assert graph.cost_matrix([], targets) == []
@@ -0,0 +1,29 @@
+from levels import line
+from src.models.site import Site
+from src.utils import search
+
+CONNECTORS = [
+    {"name": "lift", "vertices": {"A": 0, "B": 0}},
+    {"name": "stairs", "vertices": {"A": 4, "B": 4}, "transfer_cost": 5},
+]
+
+
+def test_routes_take_the_cheapest_connector(graph_file):
+    path = graph_file({"A": line(5), "B": line(5), "C": line(2)}, CONNECTORS)
+    site = Site(path)
+
+    assert site.plan_route("A", 1, "B", 3) == ([("A", [1, 0]), ("B", [0, 1, 2, 3])], 5)
+    site.level("A").close_lane(1, 0)
+    assert site.plan_route("A", 1, "B", 3) == (
+        [("A", [1, 2, 3, 4]), ("B", [4, 3])],
+        9,
+    )
+    assert site.plan_route("B", 3, "B", 1) == ([("B", [3, 2, 1])], 2)
+
+
+def test_levels_without_connectors_are_unreachable(graph_file):
+    path = graph_file({"A": line(5), "B": line(5), "C": line(2)}, CONNECTORS)
+    site = Site(path)
+
+    assert site.plan_route("A", 1, "C", 0) == (None, search.INF)
+    assert site.plan_route("A", 1, "B", 9) == (None, search.INF)
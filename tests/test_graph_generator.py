@@ -0,0 +1,22 @@
+from src.models.nav_graph import NavGraph
+from src.utils.graph_generator import tiled_sample, warehouse_grid
+
+
+def test_tiled_sample_accepts_both_lane_formats(graph_file):
+    level = {
+        "vertices": [{"x": 0, "y": 0, "properties": {"name": "dock"}}, [1, 0]],
+        "lanes": [{"start": 0, "end": 1, "properties": {"speed_limit": 2.0}}, [1, 0]],
+    }
+    tiled = tiled_sample(level, 2, 3)
+    assert len(tiled["vertices"]) == 12
+    # Two lanes per tile, two per joint between neighbouring tiles
+    assert len(tiled["lanes"]) == 2 * 6 + 2 * 7
+
+    graph = NavGraph(graph_file({"level1": tiled}), cost_model="time")
+    assert graph.get_speed_limit(10, 11) == 2.0
+    assert graph.component_info()["strongly_connected"]
+
+
+def test_generated_levels_are_deterministic():
+    assert warehouse_grid(6, 6, seed=3) == warehouse_grid(6, 6, seed=3)
+    assert warehouse_grid(6, 6, seed=3) != warehouse_grid(6, 6, seed=4)
@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from levels import LIFT, line, line_with_detour
+from src.controllers.fleet_manager import FleetManager
+from src.models.nav_graph import NavGraph
+from src.utils.graph_generator import warehouse_grid
+
+
+def test_incremental_planner_matches_dijkstra(graph_file):
+    graph = NavGraph(
+        graph_file({"level1": warehouse_grid(12, 12, seed=1)}),
+        cost_model="time",
+        path_cache_size=0,
+    )
+    rng = random.Random(2)
+    lanes = graph.get_lanes()
+    destinations = [0, 77, 143]
+    closed = []
+
+    for step in range(12):
+        lane = rng.choice(lanes)
+        if step % 4 == 3:
+            graph.reopen_lane(*closed.pop(0))
+        elif step % 4 == 2:
+            graph.set_speed_limit(lane["start"], lane["end"], rng.choice([0.5, 4]))
+        else:
+            graph.close_lane(lane["start"], lane["end"])
+            closed.append((lane["start"], lane["end"]))
+        planners = dict(graph.snapshot._planners)
+        for destination in destinations:
+            for start in rng.sample(range(144), 10):
+                _, expected = graph.find_path(start, destination, algorithm="dijkstra")
+                path, cost = graph.find_path_incremental(start, destination)
+                if expected == float("inf"):
+                    assert path is None
+                    continue
+                assert cost == pytest.approx(expected)
+                assert path[0] == start and path[-1] == destination
+                lane_costs = sum(
+                    graph.lane_cost(graph.get_lane_id(tail, head), "time")
+                    for tail, head in zip(path, path[1:])
+                )
+                assert lane_costs == pytest.approx(expected)
+        # Planners are repaired in place, not rebuilt
+        for key, planner in planners.items():
+            assert graph.snapshot._planners[key] is planner
+
+
+def test_lane_closure_replans_current_leg(graph_file):
+    fleet_manager = FleetManager(graph_file({"A": line_with_detour()}), "A")
+    fleet_manager.spawn_robot(0)
+    fleet_manager.assign_task("R1", 2)
+    robot = fleet_manager.robots["R1"]
+    assert robot.path[-2:] == [1, 2]
+
+    fleet_manager.close_lane(0, 1)
+    assert robot.path == [3, 2]
+    fleet_manager.reopen_lane(0, 1)
+    assert robot.path == [1, 2]
+
+
+def test_lane_closure_replans_queued_legs(graph_file):
+    path = graph_file({"A": line(3), "B": line_with_detour()}, [LIFT])
+    fleet_manager = FleetManager(path, "A")
+    fleet_manager.spawn_robot(0, "A")
+    fleet_manager.assign_task("R1", 2, "B")
+    robot = fleet_manager.robots["R1"]
+    assert list(robot.legs) == [("B", [0, 1, 2])]
+
+    fleet_manager.close_lane(0, 1, "B")
+    assert list(robot.legs) == [("B", [0, 3, 2])]
@@ -0,0 +1,38 @@
+import pytest
+
+from levels import line_with_detour
+from src.models.nav_graph import NavGraph
+from src.utils.graph_generator import warehouse_grid
+
+
+def route_cost(graph, path, cost_model):
+    return sum(
+        graph.lane_cost(graph.get_lane_id(start, end), cost_model)
+        for start, end in zip(path, path[1:])
+    )
+
+
+def test_k_shortest_paths_are_loopless_and_ordered(graph_file):
+    graph = NavGraph(graph_file({"level1": warehouse_grid(8, 8, seed=6)}))
+    _, best = graph.find_path(0, 63, algorithm="dijkstra")
+    routes = graph.k_shortest_paths(0, 63, 5)
+
+    assert routes[0][1] == pytest.approx(best)
+    costs = [cost for _, cost in routes]
+    assert costs == sorted(costs)
+    assert len({tuple(path) for path, _ in routes}) == len(routes)
+    for path, cost in routes:
+        assert len(set(path)) == len(path)
+        assert route_cost(graph, path, graph.cost_model) == pytest.approx(cost)
+
+
+def test_k_shortest_paths_follow_lane_changes(graph_file):
+    graph = NavGraph(graph_file({"level1": line_with_detour()}))
+    assert [path for path, _ in graph.k_shortest_paths(0, 2, 5)] == [
+        [0, 1, 2],
+        [0, 3, 2],
+    ]
+    assert graph.k_shortest_paths(0, 2, 1) == [([0, 1, 2], 2.0)]
+
+    graph.close_lane(0, 1)
+    assert graph.k_shortest_paths(0, 2, 5) == [([0, 3, 2], 2.0)]
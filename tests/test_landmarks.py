@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+from src.models.nav_graph import NavGraph
+from src.utils.graph_generator import aisle_layout
+
+
+def test_landmark_bounds_are_admissible(graph_file):
+    graph = NavGraph(graph_file({"level1": aisle_layout(5, 12, seed=1)}))
+    landmarks = graph.build_landmarks(count=4, cost_model="distance")
+    n = len(graph.vertices)
+
+    assert len(landmarks.landmarks) == 4
+    for goal in range(0, n, 7):
+        bound = landmarks.heuristic_to(goal)
+        for vertex in range(n):
+            cost = graph.get_distance(vertex, goal, "distance")
+            assert bound(vertex) <= cost + 1e-9
+
+
+@pytest.mark.parametrize("algorithm", ["astar", "bidirectional_astar"])
+def test_landmark_searches_follow_lane_changes(graph_file, algorithm):
+    graph = NavGraph(
+        graph_file({"level1": aisle_layout(5, 12, seed=2)}),
+        cost_model="time",
+        path_cache_size=0,
+    )
+    graph.build_landmarks(count=4)
+    rng = random.Random(3)
+    lanes = graph.get_lanes()
+    n = len(graph.vertices)
+
+    # Closures and slowdowns keep the bounds; a faster lane disables them
+    for speed in [None, 0.5, None, 3.0]:
+        lane = rng.choice(lanes)
+        if speed is None:
+            graph.close_lane(lane["start"], lane["end"])
+        else:
+            graph.set_speed_limit(lane["start"], lane["end"], speed)
+        for _ in range(20):
+            start, destination = rng.randrange(n), rng.randrange(n)
+            _, expected = graph.find_path(start, destination, algorithm="dijkstra")
+            _, cost = graph.find_path(start, destination, algorithm=algorithm)
+            assert cost == pytest.approx(expected)
@@ -0,0 +1,22 @@
+import math
+
+import pytest
+
+from levels import line_with_detour
+from src.models.nav_graph import NavGraph
+
+
+def test_lane_geometry_matches_vertex_coordinates(graph_file):
+    graph = NavGraph(graph_file({"level1": line_with_detour()}))
+
+    assert graph.get_lane_geometry(graph.get_lane_id(3, 2)) == pytest.approx(
+        {
+            "length": math.sqrt(2),
+            "heading": -math.pi / 4,
+            "midpoint": (1.5, 0.5),
+            "bbox": (1, 0, 2, 1),
+        }
+    )
+    assert graph.get_lane_geometry(graph.get_lane_id(1, 0))["heading"] == math.pi
+    # Lane costs use the precomputed length
+    assert graph.lane_cost(graph.get_lane_id(0, 3), "distance") == math.sqrt(2)
@@ -0,0 +1,53 @@
+from src.models.nav_graph import NavGraph
+
+
+def vertices(count):
+    return [[i, 0, {"name": ""}] for i in range(count)]
+
+
+def test_duplicate_lanes_are_merged(graph_file):
+    level = {
+        "vertices": vertices(3),
+        "lanes": [
+            [0, 1, {"speed_limit": 2}],
+            [1, 0, {}],
+            [0, 1, {"speed_limit": 3, "width": 1.5}],
+            [0, 1, {}],
+            [1, 2, {}],
+        ],
+    }
+    graph = NavGraph(graph_file({"level1": level}))
+
+    assert len(graph.get_lanes()) == 3
+    assert graph.get_neighbors(0) == [(1, 2)]
+    assert graph.get_lane(0, 1)["width"] == 1.5
+    assert graph.lane_conflicts == [
+        {"start": 0, "end": 1, "property": "speed_limit", "kept": 2, "ignored": 3}
+    ]
+
+
+def test_one_way_lanes_are_enforced(graph_file):
+    level = {"vertices": vertices(3), "lanes": [[0, 1, {}], [1, 2, {}]]}
+    graph = NavGraph(graph_file({"level1": level}))
+
+    assert graph.get_shortest_path(0, 2) == [0, 1, 2]
+    assert graph.get_shortest_path(2, 0) is None
+    assert graph.get_lane_id(1, 0) is None
+
+
+def test_bidirectional_lanes_add_the_reverse_lane(graph_file):
+    level = {
+        "vertices": vertices(3),
+        "lanes": [
+            [0, 1, {"bidirectional": True, "speed_limit": 2}],
+            [2, 1, {"speed_limit": 4}],
+            [1, 2, {"bidirectional": True}],
+        ],
+    }
+    graph = NavGraph(graph_file({"level1": level}))
+
+    assert graph.get_speed_limit(1, 0) == 2
+    # A lane listed in the file wins over the reverse of a bidirectional one
+    assert graph.get_speed_limit(2, 1) == 4
+    assert len(graph.get_lanes()) == 4
+    assert graph.get_shortest_path(2, 0) == [2, 1, 0]
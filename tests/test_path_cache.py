@@ -0,0 +1,38 @@
+from levels import line, line_with_detour
+from src.models.nav_graph import NavGraph
+
+
+def test_repeated_queries_hit_the_cache(graph_file):
+    graph = NavGraph(graph_file({"level1": line_with_detour()}))
+    path = graph.get_shortest_path(0, 2)
+    path.append(99)  # Callers get their own copy
+
+    assert graph.get_shortest_path(0, 2) == [0, 1, 2]
+    info = graph.path_cache_info()
+    assert (info["hits"], info["misses"], info["size"]) == (1, 1, 1)
+
+
+def test_lane_changes_invalidate_cached_paths(graph_file):
+    graph = NavGraph(graph_file({"level1": line_with_detour()}))
+    assert graph.get_shortest_path(0, 2) == [0, 1, 2]
+    version = graph.version
+
+    graph.close_lane(0, 1)
+    assert graph.version == version + 1
+    assert graph.get_shortest_path(0, 2) == [0, 3, 2]
+    assert graph.path_cache_info()["hits"] == 0
+
+
+def test_cache_is_bounded(graph_file):
+    graph = NavGraph(graph_file({"level1": line(6)}), path_cache_size=2)
+    for destination in range(1, 6):
+        graph.find_path(0, destination)
+    assert graph.path_cache_info()["size"] == 2
+
+    graph.find_path(0, 5)  # Most recent: still cached
+    graph.find_path(0, 1)  # Evicted
+    info = graph.path_cache_info()
+    assert (info["hits"], info["misses"]) == (1, 6)
+
+    graph.clear_path_cache()
+    assert graph.path_cache_info()["size"] == 0
@@ -0,0 +1,123 @@
+import copy
+import json
+
+import pytest
+
+from levels import LIFT, line, line_with_detour
+from src.controllers.fleet_manager import FleetManager
+from src.models.nav_graph import NavGraph
+from src.models.site import Site
+from src.utils.graph_generator import warehouse_grid
+
+
+def test_reload_applies_edit_to_changed_lanes(graph_file):
+    levels = {"A": warehouse_grid(5, 5, seed=1)}
+    path = graph_file(levels)
+    site = Site(path, use_compiled=False)
+    graph = site.level("A")
+    graph.close_lane(6, 7)
+
+    edited = copy.deepcopy(levels)
+    removed = edited["A"]["lanes"].pop(0)
+    graph_file(edited)
+
+    changes = site.reload()
+    assert changes == {"A": {(removed[0], removed[1])}}
+    assert graph.get_lane_id(removed[0], removed[1]) is None
+    assert graph.snapshot.lane_closed[graph.get_lane_id(6, 7)]
+    assert site.reload() == {}  # Unchanged file
+
+
+
+def test_reload_is_all_or_nothing(graph_file):
+    levels = {"A": warehouse_grid(4, 4, seed=1), "B": warehouse_grid(4, 4, seed=2)}
+    path = graph_file(levels)
+    site = Site(path, use_compiled=False)
+    first, second = site.level("A"), site.level("B")
+    versions = first.version, second.version
+
+    edited = copy.deepcopy(levels)
+    del edited["A"]["lanes"][:2]
+    del edited["B"]["vertices"][3][1:]  # Vertex without "y"
+    graph_file(edited)
+    with pytest.raises(ValueError):
+        site.reload()
+    assert (first.version, second.version) == versions
+
+    # Once the file is fixed the edit is picked up, not skipped as seen
+    edited["B"] = levels["B"]
+    graph_file(edited)
+    assert set(site.reload()) == {"A"}
+
+
+
+def test_reload_rejects_files_without_levels(graph_file, tmp_path):
+    path = graph_file({"A": warehouse_grid(3, 3)})
+    site = Site(path, use_compiled=False)
+    (tmp_path / "graph.json").write_text(json.dumps({"building_name": "x"}))
+    with pytest.raises(ValueError):
+        site.reload()
+
+
+
+def test_reload_replans_robots_using_changed_lanes(graph_file):
+    levels = {"A": line(3), "B": line_with_detour()}
+    path = graph_file(levels, [LIFT])
+    fleet_manager = FleetManager(path, "A")
+    fleet_manager.spawn_robot(0, "A")
+    fleet_manager.assign_task("R1", 2, "B")
+    robot = fleet_manager.robots["R1"]
+
+    edited = copy.deepcopy(levels)
+    edited["B"]["lanes"].remove([0, 1, {}])
+    graph_file(edited, [LIFT])
+    assert fleet_manager.reload_graph() == {"B": {(0, 1)}}
+    assert list(robot.legs) == [("B", [0, 3, 2])]
+
+
+
+def test_failed_reload_is_retried(graph_file, tmp_path):
+    levels = {"A": line_with_detour()}
+    path = graph_file(levels)
+    fleet_manager = FleetManager(path, "A")
+    (tmp_path / "graph.json").write_text('{"levels": {"A": {"vertices": [[0]]}}}')
+    assert fleet_manager.reload_graph() == {}
+
+    graph_file({"A": line(3)})
+    assert fleet_manager.reload_graph() == {"A": {(0, 3), (3, 2)}}
+
+
+
+def test_reload_adding_a_vertex_relabels_components(graph_file):
+    level = line(2)
+    path = graph_file({"A": level})
+    graph = NavGraph(path, "A", use_compiled=False)
+
+    # A new charger before its lanes exist
+    level["vertices"].append([5, 5, {"name": "charger", "is_charger": True}])
+    graph_file({"A": level})
+    assert graph.reload() == set()
+    assert graph.find_path(0, 2) == (None, float("inf"))
+    assert graph.find_path(2, 0) == (None, float("inf"))
+    assert graph.component_info()["strong_components"] == 2
+
+
+def test_reload_keeps_levels_in_use(graph_file):
+    levels = {"A": line(3), "B": line_with_detour()}
+    path = graph_file(levels, [LIFT])
+    fleet_manager = FleetManager(path, "A")
+    fleet_manager.spawn_robot(0, "A")
+    fleet_manager.assign_task("R1", 2, "B")
+
+    # B is on the robot's route, A is shown and holds the robot
+    for removed in ("A", "B"):
+        edited = {name: level for name, level in levels.items() if name != removed}
+        graph_file(edited)
+        assert fleet_manager.reload_graph() == {}
+        assert fleet_manager.site.level_names == ["A", "B"]
+    fleet_manager.graph.get_lanes()
+
+    # Once the robot has arrived, B can go
+    fleet_manager.robots.clear()
+    assert fleet_manager.reload_graph() == {"B": None}
+    assert fleet_manager.site.level_names == ["A"]
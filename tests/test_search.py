@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+from src.models.nav_graph import NavGraph
+from src.utils import search
+from src.utils.graph_generator import aisle_layout, random_geometric, warehouse_grid
+
+LEVELS = {
+    "grid": lambda: warehouse_grid(12, 12, seed=1),
+    "aisles": lambda: aisle_layout(6, 20, seed=2),
+    "geometric": lambda: random_geometric(150, seed=3),
+}
+
+ALGORITHMS = ["astar", "bidirectional", "bidirectional_astar", "ch", "hpa"]
+
+
+def random_pairs(graph, count, seed=0):
+    rng = random.Random(seed)
+    n = len(graph.vertices)
+    return [(rng.randrange(n), rng.randrange(n)) for _ in range(count)]
+
+
+def route_cost(graph, path, cost_model):
+    return sum(
+        graph.lane_cost(graph.get_lane_id(start, end), cost_model)
+        for start, end in zip(path, path[1:])
+    )
+
+
+def check_route(graph, start, destination, path, cost, expected, cost_model):
+    if expected == search.INF:
+        assert path is None and cost == search.INF
+        return
+    assert cost == pytest.approx(expected)
+    assert path[0] == start and path[-1] == destination
+    assert route_cost(graph, path, cost_model) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("layout", LEVELS)
+@pytest.mark.parametrize("cost_model", search.COST_MODELS)
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+def test_algorithms_match_dijkstra(graph_file, layout, cost_model, algorithm):
+    path = graph_file({"level1": LEVELS[layout]()})
+    graph = NavGraph(path, cost_model=cost_model, path_cache_size=0)
+    if algorithm == "hpa":
+        graph.build_cluster_hierarchy(vertices_per_cluster=16)
+
+    for start, destination in random_pairs(graph, 40):
+        _, expected = graph.find_path(start, destination, algorithm="dijkstra")
+        found, cost = graph.find_path(start, destination, algorithm=algorithm)
+        check_route(graph, start, destination, found, cost, expected, cost_model)
+
+
+@pytest.mark.parametrize("algorithm", ["astar", "bidirectional", "ch", "hpa"])
+def test_algorithms_follow_lane_changes(graph_file, algorithm):
+    graph = NavGraph(
+        graph_file({"level1": warehouse_grid(10, 10, seed=4)}),
+        cost_model="time",
+        path_cache_size=0,
+    )
+    if algorithm == "hpa":
+        graph.build_cluster_hierarchy(vertices_per_cluster=8)
+    rng = random.Random(5)
+    lanes = graph.get_lanes()
+
+    for step in range(8):
+        lane = rng.choice(lanes)
+        if step % 3 == 2:
+            graph.set_speed_limit(lane["start"], lane["end"], 0.25)
+        else:
+            graph.close_lane(lane["start"], lane["end"])
+        for start, destination in random_pairs(graph, 15, seed=step):
+            _, expected = graph.find_path(start, destination, algorithm="dijkstra")
+            found, cost = graph.find_path(start, destination, algorithm=algorithm)
+            check_route(graph, start, destination, found, cost, expected, "time")
+
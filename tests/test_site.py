@@ -0,0 +1,29 @@
+from src.controllers.fleet_manager import FleetManager
+from src.models.site import Site
+from src.utils.graph_generator import warehouse_grid
+
+
+def test_evicted_levels_keep_runtime_lane_state(graph_file):
+    path = graph_file({"A": warehouse_grid(6, 6, seed=1), "B": warehouse_grid(6, 6)})
+    site = Site(path, memory_budget=1, use_compiled=False)
+    graph = site.level("A")
+    graph.close_lane(0, 1)
+    graph.set_speed_limit(1, 2, 0.25)
+
+    site.level("B")
+    assert site.loaded_levels() == ["B"]
+    reloaded = site.level("A")
+    assert reloaded is not graph
+    assert reloaded.closed_lane_count == 1
+    assert reloaded.snapshot.lane_closed[reloaded.get_lane_id(0, 1)]
+    assert reloaded.get_speed_limit(1, 2) == 0.25
+
+
+def test_fleet_manager_graph_follows_eviction(graph_file):
+    path = graph_file({"A": warehouse_grid(6, 6, seed=1), "B": warehouse_grid(6, 6)})
+    fleet_manager = FleetManager(path, "A", memory_budget=1)
+    fleet_manager.close_lane(0, 1)
+    fleet_manager.site.level("B")
+
+    assert fleet_manager.graph is fleet_manager.site.level("A")
+    assert fleet_manager.graph.closed_lane_count == 1
@@ -0,0 +1,18 @@
+import pytest
+
+from levels import line
+from src.models.nav_graph import NavGraph
+
+
+def test_graph_properties_read_the_current_snapshot(graph_file):
+    graph = NavGraph(graph_file({"level1": line(3)}))
+    pinned = graph.snapshot
+    graph.close_lane(0, 1)
+
+    assert graph.snapshot is not pinned
+    assert graph.version == pinned.generation + 1
+    assert graph.closed_lane_count == 1 and pinned.closed_lane_count == 0
+    assert graph.lane_closed[graph.lane_index[(0, 1)]]
+    assert list(graph.vertices) == [0, 1, 2]
+    with pytest.raises(AttributeError):
+        graph.offsets  # Internal arrays are only read from a snapshot
@@ -0,0 +1,25 @@
+import math
+import random
+
+from src.models.nav_graph import NavGraph
+from src.utils.graph_generator import random_geometric
+
+
+def test_spatial_queries_match_brute_force(graph_file):
+    graph = NavGraph(graph_file({"level1": random_geometric(200, seed=7)}))
+    xs, ys = graph.vertex_x, graph.vertex_y
+    rng = random.Random(8)
+
+    def distance(v, x, y):
+        return math.dist((xs[v], ys[v]), (x, y))
+
+    for _ in range(30):
+        # Points far outside the vertices included
+        x, y = rng.uniform(-500, 500), rng.uniform(-500, 500)
+        ranked = sorted(graph.vertices, key=lambda v: (distance(v, x, y), v))
+        assert graph.nearest_vertex(x, y) == ranked[0]
+        assert graph.k_nearest(x, y, 4) == ranked[:4]
+        radius = rng.uniform(0, 300)
+        assert graph.within_radius(x, y, radius) == [
+            v for v in ranked if distance(v, x, y) <= radius
+        ]
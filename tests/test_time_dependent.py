@@ -0,0 +1,75 @@
+import json
+import random
+
+import pytest
+
+from levels import line_with_detour
+from src.models.nav_graph import NavGraph
+from src.utils.graph_generator import warehouse_grid
+from src.utils.time_dependent import CongestionProfile
+
+# Three times slower from 100 to 200, back to normal by 210
+RUSH = [[0, 1.0], [90, 1.0], [100, 3.0], [200, 3.0], [210, 1.0]]
+
+
+def travel_time(graph, path, departure):
+    t = departure
+    for start, end in zip(path, path[1:]):
+        lane_id = graph.get_lane_id(start, end)
+        profile = graph.lane_profiles.get(lane_id)
+        factor = profile.factor(t) if profile else 1.0
+        t += graph.lane_cost(lane_id, "time") * factor
+    return t - departure
+
+
+@pytest.mark.parametrize("algorithm", ["dijkstra", "astar"])
+def test_find_path_at_avoids_rush_hours(graph_file, algorithm):
+    graph = NavGraph(graph_file({"level1": line_with_detour()}))
+    graph.set_lane_profile(0, 1, CongestionProfile(RUSH, period=1000))
+
+    assert graph.find_path_at(0, 2, 500, algorithm) == ([0, 1, 2], 2.0)
+    path, duration = graph.find_path_at(0, 2, 150, algorithm)
+    assert path == [0, 3, 2]
+    assert duration == pytest.approx(2 * 2**0.5)
+
+
+def test_find_path_at_matches_dijkstra_with_profiles(graph_file, tmp_path):
+    graph = NavGraph(graph_file({"level1": warehouse_grid(8, 8, seed=1)}))
+    rng = random.Random(2)
+    lanes = rng.sample(graph.get_lanes(), 40)
+    profiles = tmp_path / "profiles.json"
+    profiles.write_text(
+        json.dumps(
+            {
+                "period": 1000,
+                "profiles": {"rush": RUSH},
+                "levels": {
+                    "level1": [[lane["start"], lane["end"], "rush"] for lane in lanes]
+                },
+            }
+        )
+    )
+    assert graph.load_profiles(profiles) == 40
+
+    for _ in range(30):
+        start, destination = rng.randrange(64), rng.randrange(64)
+        departure = rng.uniform(0, 1000)
+        path, duration = graph.find_path_at(start, destination, departure, "dijkstra")
+        found, found_duration = graph.find_path_at(start, destination, departure)
+        assert found_duration == pytest.approx(duration)
+        if path is not None:
+            assert travel_time(graph, path, departure) == pytest.approx(duration)
+            assert travel_time(graph, found, departure) == pytest.approx(duration)
+
+
+def test_profiles_breaking_fifo_are_rejected(graph_file):
+    graph = NavGraph(graph_file({"level1": line_with_detour()}))
+    with pytest.raises(ValueError):
+        # Leaving at 1 would arrive before leaving at 0
+        graph.set_lane_profile(0, 1, CongestionProfile([[0, 5.0], [1, 1.0]], 100))
+
+    # Allowed at full speed, but not once the lane is four times slower
+    graph.set_lane_profile(0, 1, CongestionProfile([[0, 1.5], [1, 1.0]], 100))
+    with pytest.raises(ValueError):
+        graph.set_speed_limit(0, 1, 0.25)
+    assert graph.get_speed_limit(0, 1) == 1
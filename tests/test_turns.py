@@ -0,0 +1,80 @@
+import math
+import random
+
+import pytest
+
+from src.models.nav_graph import NavGraph
+from src.utils import search
+from src.utils.graph_generator import warehouse_grid
+from src.utils.turns import TurnPenalties
+
+
+def square_grid(size):
+    """size x size vertices, id y * size + x, two-way lanes between neighbours."""
+    vertices = [[i % size, i // size, {"name": ""}] for i in range(size * size)]
+    lanes = []
+    for i in range(size * size):
+        if i % size < size - 1:
+            lanes += [[i, i + 1, {}], [i + 1, i, {}]]
+        if i + size < size * size:
+            lanes += [[i, i + size, {}], [i + size, i, {}]]
+    return {"vertices": vertices, "lanes": lanes}
+
+
+def turn_cost(graph, path, penalties, cost_model):
+    lane_ids = [graph.get_lane_id(start, end) for start, end in zip(path, path[1:])]
+    headings = graph.snapshot.lane_heading
+    return sum(graph.lane_cost(lane_id, cost_model) for lane_id in lane_ids) + sum(
+        penalties.penalty(headings[first], headings[second])
+        for first, second in zip(lane_ids, lane_ids[1:])
+    )
+
+
+def test_penalty_buckets():
+    penalties = TurnPenalties()
+    assert penalties.penalty(0.0, 0.0) == 0.0
+    assert penalties.penalty(0.0, math.pi / 2) == 1.0
+    assert penalties.penalty(math.pi / 2, -math.pi / 2) == 2.0
+    assert penalties.penalty(-3.0, 3.0) == 0.0  # 0.28 rad across the wrap
+    with pytest.raises(ValueError):
+        TurnPenalties([(90, 0.0)])
+    with pytest.raises(ValueError):
+        TurnPenalties([(180, -1.0)])
+
+
+def test_turn_penalties_prefer_straight_runs(graph_file):
+    graph = NavGraph(graph_file({"level1": square_grid(3)}))
+    _, hops = graph.find_path(0, 8)
+    assert hops == 4
+
+    graph.set_turn_penalties(TurnPenalties())
+    path, cost = graph.find_path(0, 8)
+    assert path in ([0, 1, 2, 5, 8], [0, 3, 6, 7, 8])  # One turn
+    assert cost == 5.0
+
+    graph.set_turn_penalties(None)
+    assert graph.find_path(0, 8)[1] == 4
+
+
+@pytest.mark.parametrize("algorithm", search.ALGORITHMS)
+def test_turn_aware_routes_agree(graph_file, algorithm):
+    penalties = TurnPenalties([(30, 0.0), (100, 0.75), (180, 3.0)])
+    graph = NavGraph(
+        graph_file({"level1": warehouse_grid(6, 6, seed=1)}),
+        cost_model="distance",
+        algorithm=algorithm,
+        path_cache_size=0,
+        turn_penalties=penalties,
+    )
+    if algorithm == "hpa":
+        graph.build_cluster_hierarchy(vertices_per_cluster=9)
+    rng = random.Random(2)
+
+    for _ in range(25):
+        start, destination = rng.randrange(36), rng.randrange(36)
+        _, expected = graph.find_path(start, destination, algorithm="dijkstra")
+        path, cost = graph.find_path(start, destination)
+        assert cost == pytest.approx(expected)
+        if path is not None:
+            assert path[0] == start and path[-1] == destination
+            assert turn_cost(graph, path, penalties, "distance") == pytest.approx(cost)